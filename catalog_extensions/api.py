@@ -1,8 +1,10 @@
+import hashlib
 import json
+import secrets
 from contextlib import contextmanager
 
 import frappe
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from frappe.utils import add_days, nowdate, getdate, flt, cint
 from webshop.templates.pages.product_search import get_category_suggestions
 from webshop.webshop.doctype.override_doctype.item_group import (
@@ -19,6 +21,7 @@ from webshop.webshop.shopping_cart.product_info import set_product_info_for_webs
 from catalog_extensions.brand_filtering import (
     apply_brand_filter,
     assert_item_allowed,
+    get_allowed_brands_for_customer_group,
     get_brand_filter_context,
 )
 from catalog_extensions import order_billing
@@ -51,6 +54,15 @@ RETURN_APPROVAL_ACTIVE_STATUSES = {
 }
 RETURN_APPROVAL_RECEIVED_STATUSES = {"RECEIVED", "APPROVED_ON_RECEIPT", "REJECTED_ON_RECEIPT", "CLOSED"}
 PORTAL_RETURN_REQUEST_MARKER = "[catalog_extensions_return_request]"
+FACETS_CACHE_KEY = "catalog_extensions:filter_facets"
+FACETS_GENERATION_KEY = "catalog_extensions:filter_facets_generation"
+FACETS_CACHE_TTL = 300
+FACETS_SNAPSHOT_TTL = 24 * 60 * 60
+PRICE_FACETS_TEMPLATE_CACHE_KEY = "catalog_extensions:price_facets_template"
+CHILD_GROUPS_CACHE_KEY = "catalog_extensions:item_group_children"
+PRICE_LIST_CACHE_KEY = "catalog_extensions:selling_price_list"
+PRICE_LIST_CACHE_TTL = 600
+PRICE_BUCKET_CACHE_KEY = "catalog_extensions:price_bucket"
 
 
 def _get_conf_bool(*keys: str, default: int = 1) -> int:
@@ -91,23 +103,21 @@ def get_filter_facets(
     - bench --site site.local set-config catalog_extensions_show_offers_filter 0
     - bench --site site.local set-config catalog_extensions_show_badges_filter 0
 
+    Results are cached in Redis and invalidated whenever catalog documents that
+    feed the facets change. Filtered requests expire after FACETS_CACHE_TTL
+    seconds; the unfiltered per-category view is a snapshot kept for
+    FACETS_SNAPSHOT_TTL and re-warmed by the nightly rebuild.
+
     Args:
         item_group: Optional item group name to filter facets contextually
     """
 
-    facets: Dict[str, List[Dict[str, Any]]] = {}
-
-    if isinstance(query_args, str):
-        import json as _json
+    query_args = frappe._dict(_parse_json_dict(query_args))
+    item_group = item_group or query_args.get("item_group")
+    return _get_cached_filter_facets(item_group, query_args, get_brand_filter_context())
 
-        try:
-            query_args = _json.loads(query_args)
-        except Exception:
-            query_args = {}
 
-    query_args = frappe._dict(query_args or {})
-    item_group = item_group or query_args.get("item_group")
-    
+def _get_facet_visibility() -> Tuple[int, int]:
     # Check site config for filter visibility (default to enabled)
     # Use flat keys: catalog_extensions_show_offers_filter
     show_offers = _get_conf_bool(
@@ -120,8 +130,180 @@ def get_filter_facets(
         "catalog_extensions.show_badges_filter",
         default=1,
     )
-    
-    brand_context = get_brand_filter_context()
+    return show_offers, show_badges
+
+
+def _get_cached_filter_facets(
+    item_group: Optional[str],
+    query_args: frappe._dict,
+    brand_context: frappe._dict,
+) -> Dict[str, List[Dict[str, Any]]]:
+    show_offers, show_badges = _get_facet_visibility()
+    cache_key = _get_filter_facets_cache_key(
+        item_group, query_args, brand_context, show_offers, show_badges
+    )
+    facets = frappe.cache().get_value(cache_key)
+    if facets is not None:
+        return facets
+
+    facets = _compute_filter_facets(query_args, brand_context, show_offers, show_badges)
+    expires_in_sec = FACETS_SNAPSHOT_TTL if _is_base_facet_request(query_args) else FACETS_CACHE_TTL
+    frappe.cache().set_value(cache_key, facets, expires_in_sec=expires_in_sec)
+    return facets
+
+
+# query_args keys that narrow the facet result set. Anything else (start,
+# page_length, sort order, ...) only affects the product listing.
+FACET_FILTER_KEYS = (
+    "item_group",
+    "field_filters",
+    "attribute_filters",
+    "brand",
+    "search",
+    "price_from",
+    "price_to",
+)
+
+
+def _get_facet_filter_args(query_args: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: query_args[key] for key in FACET_FILTER_KEYS if query_args.get(key)}
+
+
+def _is_base_facet_request(query_args: Dict[str, Any]) -> bool:
+    """Return True when no filters beyond the category are applied."""
+    return not any(key != "item_group" for key in _get_facet_filter_args(query_args))
+
+
+def _get_filter_facets_cache_key(
+    item_group: Optional[str],
+    query_args: Dict[str, Any],
+    brand_context: frappe._dict,
+    show_offers: int,
+    show_badges: int,
+) -> str:
+    """Build a stable Redis key for one facet request.
+
+    The brand context is part of the key because facet counts are scoped to the
+    brands the current customer group is allowed to see.
+    """
+
+    payload = json.dumps(
+        {
+            "item_group": item_group,
+            "query_args": _get_facet_filter_args(query_args),
+            "allowed_brands": sorted(brand_context.allowed_brands or []),
+            "price_list": _get_selling_price_list(),
+            "show_offers": show_offers,
+            "show_badges": show_badges,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    generation = _get_filter_facets_generation()
+    return f"{FACETS_CACHE_KEY}:{generation}:{hashlib.sha1(payload.encode()).hexdigest()}"
+
+
+def _get_filter_facets_generation() -> int:
+    """Return the current facet cache generation (a raw Redis counter)."""
+    cache = frappe.cache()
+    return cint(cache.get(cache.make_key(FACETS_GENERATION_KEY)))
+
+
+def clear_filter_facets_cache(doc=None, method=None):
+    """Invalidate all cached facet payloads; wired to catalog doc events in hooks.
+
+    Bumps the generation embedded in every facet key instead of deleting by
+    pattern, so a bulk import does one INCR per row rather than a KEYS scan.
+    Entries from older generations are never read again and expire on their own.
+    """
+    cache = frappe.cache()
+    cache.incr(cache.make_key(FACETS_GENERATION_KEY))
+
+
+def rebuild_filter_facets_snapshot() -> None:
+    """Rebuild the unfiltered facet snapshot for the catalog and each category.
+
+    Runs nightly as a fallback for changes that bypass doc events (e.g. bulk
+    SQL imports). Can also be run by hand:
+
+        bench --site site.local execute catalog_extensions.api.rebuild_filter_facets_snapshot
+
+    The scheduler user has no customer group of its own, so the snapshot is
+    warmed for every distinct brand restriction a customer group can have.
+    """
+
+    clear_filter_facets_cache()
+
+    item_groups = frappe.db.sql_list(
+        """
+        SELECT DISTINCT item_group
+        FROM `tabWebsite Item`
+        WHERE published = 1
+          AND item_group IS NOT NULL
+        """
+    )
+    for brand_context in _get_facet_brand_contexts():
+        _get_cached_filter_facets(None, frappe._dict(), brand_context)
+        for item_group in item_groups:
+            _get_cached_filter_facets(item_group, frappe._dict(item_group=item_group), brand_context)
+
+
+def _get_facet_brand_contexts() -> List[frappe._dict]:
+    """Return one brand context per distinct allowed-brand set, plus unrestricted."""
+
+    contexts = {(): frappe._dict(customer_group=None, allowed_brands=[], restricted=False)}
+    customer_groups = frappe.db.sql_list(
+        """
+        SELECT DISTINCT customer_group
+        FROM `tabCustomer Group Brand Mapping`
+        WHERE enabled = 1
+        """
+    )
+    for customer_group in customer_groups:
+        allowed_brands = get_allowed_brands_for_customer_group(customer_group)
+        contexts.setdefault(
+            tuple(sorted(allowed_brands)),
+            frappe._dict(
+                customer_group=customer_group,
+                allowed_brands=allowed_brands,
+                restricted=bool(allowed_brands),
+            ),
+        )
+    return list(contexts.values())
+
+
+@frappe.request_cache
+def _get_selling_price_list() -> str:
+    """Return the active website selling price list.
+
+    Resolved once per request and kept in Redis for PRICE_LIST_CACHE_TTL
+    seconds; Webshop Settings / Selling Settings saves drop it immediately.
+    """
+    price_list = frappe.cache().get_value(PRICE_LIST_CACHE_KEY)
+    if price_list:
+        return price_list
+
+    price_list = (
+        frappe.get_cached_doc("Webshop Settings").price_list
+        or frappe.get_cached_doc("Selling Settings").selling_price_list
+        or "Standard Selling"
+    )
+    frappe.cache().set_value(PRICE_LIST_CACHE_KEY, price_list, expires_in_sec=PRICE_LIST_CACHE_TTL)
+    return price_list
+
+
+def clear_price_list_cache(doc=None, method=None):
+    frappe.cache().delete_value(PRICE_LIST_CACHE_KEY)
+
+
+def _compute_filter_facets(
+    query_args: frappe._dict,
+    brand_context: frappe._dict,
+    show_offers: int,
+    show_badges: int,
+) -> Dict[str, List[Dict[str, Any]]]:
+    facets: Dict[str, List[Dict[str, Any]]] = {}
+
     brand_base_where, brand_base_params = _build_facet_where_clause(
         query_args, brand_context, exclude_fields={"brand"}
     )
@@ -130,39 +312,18 @@ def get_filter_facets(
         query_args, brand_context, exclude_fields={"price_from", "price_to"}
     )
 
-    facets["item_groups"] = frappe.db.sql(
-        f"""
-        SELECT ig.item_group_name, COUNT(DISTINCT wi.name) AS count
-        FROM `tabWebsite Item` wi
-        JOIN `tabItem Group` ig ON wi.item_group = ig.name
-        WHERE {brand_base_where}
-        GROUP BY ig.item_group_name
-        ORDER BY count DESC, ig.item_group_name ASC
-        """,
-        brand_base_params,
-        as_dict=True,
-    )
-
-    facets["brands"] = frappe.db.sql(
-        f"""
-        SELECT wi.brand, COUNT(DISTINCT wi.name) AS count
-        FROM `tabWebsite Item` wi
-        WHERE {brand_base_where}
-          AND wi.brand IS NOT NULL
-          AND wi.brand != ''
-        GROUP BY wi.brand
-        ORDER BY count DESC, wi.brand ASC
-        LIMIT 20
-        """,
-        brand_base_params,
-        as_dict=True,
+    facets["item_groups"], facets["brands"] = _get_item_group_and_brand_facets(
+        brand_base_where, brand_base_params
     )
 
     # Contextual price facets based on the same filtered result set.
-    facets["price_ranges"] = _get_price_range_facets(price_where, price_params)
-    facets["price_min_max"] = _get_price_min_max(price_where, price_params)
+    facets["price_ranges"], facets["price_min_max"] = _get_price_facets(price_where, price_params)
 
     # Offers facet - controlled by site config
+    # Offers and badges keep COUNT(DISTINCT wi.name): the same title can repeat
+    # within one item's child table (and an Item may have a Manual and an Auto
+    # badge of the same type, or several Website Items), so dedup is not
+    # structurally guaranteed there.
     if show_offers:
         offers_rows = frappe.db.sql(
             f"""
@@ -221,16 +382,7 @@ def _build_facet_where_clause(
 
     brand_context = brand_context or get_brand_filter_context()
 
-    raw_field_filters = query_args.get("field_filters") or {}
-    if isinstance(raw_field_filters, str):
-        import json as _json
-
-        try:
-            raw_field_filters = _json.loads(raw_field_filters) or {}
-        except Exception:
-            raw_field_filters = {}
-
-    field_filters = dict(raw_field_filters)
+    field_filters = _parse_json_dict(query_args.get("field_filters"))
 
     top_level_brand = query_args.get("brand")
     if top_level_brand and "brand" not in exclude_fields:
@@ -246,7 +398,7 @@ def _build_facet_where_clause(
     if "brand" in exclude_fields:
         field_filters.pop("brand", None)
 
-    field_filters, no_match, _context = apply_brand_filter(field_filters)
+    field_filters, no_match, _context = apply_brand_filter(field_filters, context=brand_context)
     if no_match:
         return "1 = 0", params
 
@@ -268,7 +420,7 @@ def _build_facet_where_clause(
 
     item_group = query_args.get("item_group")
     if item_group:
-        child_groups = get_child_groups_for_website(item_group, include_self=True)
+        child_groups = _get_cached_child_groups(item_group, include_self=True)
         group_names = [g.name for g in child_groups] if child_groups else [item_group]
         if group_names:
             params["item_groups"] = tuple(group_names)
@@ -324,138 +476,174 @@ def _build_facet_where_clause(
     if price_to_filter is None and "price_to" not in exclude_fields:
         price_to_filter = query_args.get("price_to")
 
-    price_item_codes = _get_item_codes_by_price_range(price_from_filter, price_to_filter)
-    if (price_from_filter or price_to_filter) and not price_item_codes:
-        return "1 = 0", params
-    if price_item_codes:
-        params["price_item_codes"] = tuple(price_item_codes)
-        conditions.append("wi.item_code IN %(price_item_codes)s")
+    price_from_f, price_to_f = _parse_price_bounds(price_from_filter, price_to_filter)
+    if price_from_f is not None or price_to_f is not None:
+        # Correlated EXISTS keeps the price intersection inside the DB instead
+        # of round-tripping every matching item_code through Python.
+        price_conditions = [
+            "ip_filter.item_code = wi.item_code",
+            "ip_filter.selling = 1",
+            "ip_filter.price_list = %(filter_price_list)s",
+        ]
+        params["filter_price_list"] = _get_selling_price_list()
+        if price_from_f is not None:
+            price_conditions.append("ip_filter.price_list_rate >= %(filter_price_from)s")
+            params["filter_price_from"] = price_from_f
+        if price_to_f is not None:
+            price_conditions.append("ip_filter.price_list_rate <= %(filter_price_to)s")
+            params["filter_price_to"] = price_to_f
+        conditions.append(
+            f"""
+            EXISTS (
+                SELECT 1
+                FROM `tabItem Price` ip_filter
+                WHERE {" AND ".join(price_conditions)}
+            )
+            """
+        )
 
     return " AND ".join(conditions), params
 
 
-def _get_price_min_max(
-    base_where: Optional[str] = None, base_params: Optional[Dict[str, Any]] = None
-) -> Dict[str, Optional[float]]:
-    """Return min/max price across the current filtered Website Item result set.
+def _get_item_group_and_brand_facets(
+    base_where: str, base_params: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (item_groups, brands) facet counts from a single grouped query.
 
-    Used by the frontend price slider as true dataset bounds.
+    Website Item names are unique per row, so per-(group, brand) counts can be
+    summed in Python without double counting.
     """
 
-    price_list = (
-        frappe.db.get_single_value("Webshop Settings", "price_list")
-        or frappe.db.get_single_value("Selling Settings", "selling_price_list")
-        or "Standard Selling"
+    # wi.name is the primary key and the Item Group join is on its primary key,
+    # so every Website Item contributes exactly one row: COUNT(*) needs no DISTINCT.
+    rows = frappe.db.sql(
+        f"""
+        SELECT ig.item_group_name, wi.brand, COUNT(*) AS count
+        FROM `tabWebsite Item` wi
+        LEFT JOIN `tabItem Group` ig ON wi.item_group = ig.name
+        WHERE {base_where}
+        GROUP BY ig.item_group_name, wi.brand
+        """,
+        base_params,
+        as_dict=True,
     )
 
-    where_sql = base_where or "wi.published = 1"
-    params = dict(base_params or {})
+    group_counts: Dict[str, int] = {}
+    brand_counts: Dict[str, int] = {}
+    for row in rows:
+        if row.item_group_name:
+            group_counts[row.item_group_name] = group_counts.get(row.item_group_name, 0) + row.count
+        if row.brand:
+            brand_counts[row.brand] = brand_counts.get(row.brand, 0) + row.count
+
+    item_groups = [
+        frappe._dict(item_group_name=name, count=count)
+        for name, count in sorted(group_counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    ]
+    brands = [
+        frappe._dict(brand=name, count=count)
+        for name, count in sorted(brand_counts.items(), key=lambda kv: (-kv[1], kv[0]))[:20]
+    ]
+    return item_groups, brands
+
+
+def _get_price_facets(
+    base_where: Optional[str] = None, base_params: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Optional[float]]]:
+    """Return (price_ranges, price_min_max) for the current filtered result set.
+
+    Each site can define its own ranges in the `Catalog Price Range` DocType.
+    We count Website Items whose Item Price (for the active price list) falls
+    within each configured range, and compute the min/max bounds used by the
+    frontend price slider, in the same pass over the join.
+    """
+
+    # Try to get a relevant selling price list for this site
+    price_list = _get_selling_price_list()
+    template = _get_price_facets_template()
+    ranges = template["ranges"]
+
+    base_where = base_where or "wi.published = 1"
+    params: Dict[str, Any] = dict(base_params or {})
+    params.update(template["params"])
     params["price_list"] = price_list
 
-    row = frappe.db.sql(
+    count_res = frappe.db.sql(
         f"""
-        SELECT
-            MIN(ip.price_list_rate) AS min_rate,
-            MAX(ip.price_list_rate) AS max_rate
+        SELECT {template["select_sql"]}
         FROM `tabWebsite Item` wi
-        JOIN `tabItem` i ON i.name = wi.item_code
-        JOIN `tabItem Price` ip ON ip.item_code = i.name
-        WHERE {where_sql}
+        JOIN `tabItem Price` ip ON ip.item_code = wi.item_code
+        WHERE {base_where}
           AND ip.selling = 1
           AND ip.price_list = %(price_list)s
         """,
         params,
         as_dict=True,
     )
+    counts = count_res[0] if count_res else {}
 
-    if not row:
-        return {"min": None, "max": None}
+    price_ranges = [
+        {
+            "name": r["name"],
+            "label": r["label"],
+            "from_amount": r.get("from_amount"),
+            "to_amount": r.get("to_amount"),
+            "count": counts.get(f"range_{idx}") or 0,
+        }
+        for idx, r in enumerate(ranges)
+    ]
 
-    min_rate = row[0].get("min_rate")
-    max_rate = row[0].get("max_rate")
+    min_rate = counts.get("min_rate")
+    max_rate = counts.get("max_rate")
 
     # Normalize to plain floats for JSON
-    return {
+    return price_ranges, {
         "min": float(min_rate) if min_rate is not None else None,
         "max": float(max_rate) if max_rate is not None else None,
     }
 
 
-def _get_price_range_facets(
-    base_where: Optional[str] = None, base_params: Optional[Dict[str, Any]] = None
-) -> List[Dict[str, Any]]:
-    """Return price range facets based on Catalog Price Range records.
+def _get_price_facets_template() -> Dict[str, Any]:
+    """Return enabled price ranges with their pre-built aggregation SELECT list.
 
-    Each site can define its own ranges in the `Catalog Price Range` DocType.
-    We count Website Items whose Item Price (for the active price list) falls
-    within each configured range for the current filtered result set.
+    The range rows and the SQL fragment derived from them only change when a
+    Catalog Price Range is edited, so both are kept in Redis until then.
     """
 
-    # Try to get a relevant selling price list for this site
-    price_list = (
-        frappe.db.get_single_value("Webshop Settings", "price_list")
-        or frappe.db.get_single_value("Selling Settings", "selling_price_list")
-        or "Standard Selling"
-    )
-
-    ranges = frappe.get_all(
-        "Catalog Price Range",
-        filters={"enabled": 1},
-        fields=["name", "label", "from_amount", "to_amount", "sort_order"],
-        order_by="COALESCE(sort_order, 9999), from_amount asc, to_amount asc, name asc",
-    )
-
-    if not ranges:
-        return []
-
-    facets: List[Dict[str, Any]] = []
-    base_where = base_where or "wi.published = 1"
+    def build_template() -> Dict[str, Any]:
+        ranges = frappe.get_all(
+            "Catalog Price Range",
+            filters={"enabled": 1},
+            fields=["name", "label", "from_amount", "to_amount", "sort_order"],
+            order_by="COALESCE(sort_order, 9999), from_amount asc, to_amount asc, name asc",
+        )
 
-    for r in ranges:
-        where_clauses = [
-            base_where,
-            "ip.selling = 1",
-            "ip.price_list = %(price_list)s",
+        # Count every range in one pass over the join instead of one query per range.
+        params: Dict[str, Any] = {}
+        select_parts = [
+            "MIN(ip.price_list_rate) AS min_rate",
+            "MAX(ip.price_list_rate) AS max_rate",
         ]
+        for idx, r in enumerate(ranges):
+            bounds = []
+            if r.get("from_amount") is not None:
+                bounds.append(f"ip.price_list_rate >= %(range_from_{idx})s")
+                params[f"range_from_{idx}"] = r["from_amount"]
+            if r.get("to_amount") is not None:
+                bounds.append(f"ip.price_list_rate < %(range_to_{idx})s")
+                params[f"range_to_{idx}"] = r["to_amount"]
 
-        params: Dict[str, Any] = dict(base_params or {})
-        params["price_list"] = price_list
-
-        if r.get("from_amount") is not None:
-            where_clauses.append("ip.price_list_rate >= %(from_amount)s")
-            params["from_amount"] = r["from_amount"]
-
-        if r.get("to_amount") is not None:
-            where_clauses.append("ip.price_list_rate < %(to_amount)s")
-            params["to_amount"] = r["to_amount"]
-
-        where_sql = " AND ".join(where_clauses)
+            condition = " AND ".join(bounds) or "1 = 1"
+            select_parts.append(f"COUNT(DISTINCT CASE WHEN {condition} THEN wi.name END) AS range_{idx}")
 
-        count_res = frappe.db.sql(
-            f"""
-            SELECT COUNT(DISTINCT wi.name) AS count
-            FROM `tabWebsite Item` wi
-            JOIN `tabItem` i ON i.name = wi.item_code
-            JOIN `tabItem Price` ip ON ip.item_code = i.name
-            WHERE {where_sql}
-            """,
-            params,
-            as_dict=True,
-        )
+        return {"ranges": ranges, "select_sql": ", ".join(select_parts), "params": params}
 
-        count = (count_res[0]["count"] if count_res else 0) or 0
+    return frappe.cache().get_value(PRICE_FACETS_TEMPLATE_CACHE_KEY, generator=build_template)
 
-        facets.append(
-            {
-                "name": r["name"],
-                "label": r["label"],
-                "from_amount": r.get("from_amount"),
-                "to_amount": r.get("to_amount"),
-                "count": count,
-            }
-        )
 
-    return facets
+def clear_price_facets_template_cache(doc=None, method=None):
+    frappe.cache().delete_value(PRICE_FACETS_TEMPLATE_CACHE_KEY)
+    frappe.cache().delete_key(PRICE_BUCKET_CACHE_KEY)
 
 
 def _get_availability_facets() -> List[Dict[str, Any]]:
@@ -494,27 +682,6 @@ def _get_availability_facets() -> List[Dict[str, Any]]:
     ]
 
 
-def _is_date_active(valid_from: Optional[str], valid_upto: Optional[str]) -> bool:
-    """Return True if today's date is within the optional valid_from / valid_upto window."""
-
-    today = getdate(nowdate())
-    if valid_from:
-        try:
-            if today < getdate(valid_from):
-                return False
-        except Exception:
-            pass
-
-    if valid_upto:
-        try:
-            if today > getdate(valid_upto):
-                return False
-        except Exception:
-            pass
-
-    return True
-
-
 @frappe.whitelist()
 def recompute_item_badges() -> None:
     """Recompute automatic badges (New, Bestseller, On Sale, Low Stock) for all Website Items.
@@ -530,35 +697,40 @@ def recompute_item_badges() -> None:
     today = nowdate()
     new_since = add_days(today, -days_for_new)
 
-    # Map item_code -> total qty sold in the last 30 days (very rough bestseller metric)
-    sales_rows = frappe.db.sql(
-        """
-        SELECT si_item.item_code, SUM(si_item.qty) AS qty
-        FROM `tabSales Invoice Item` si_item
-        JOIN `tabSales Invoice` si ON si.name = si_item.parent
-        WHERE si.docstatus = 1 AND si.posting_date >= %(from_date)s
-        GROUP BY si_item.item_code
-        """,
-        {"from_date": new_since},
-        as_dict=True,
+    # Top N item_codes by qty sold in the last 30 days (very rough bestseller
+    # metric). Ranking happens in SQL so only N rows come back to Python.
+    bestseller_codes = set(
+        frappe.db.sql_list(
+            """
+            SELECT si_item.item_code
+            FROM `tabSales Invoice Item` si_item
+            JOIN `tabSales Invoice` si ON si.name = si_item.parent
+            WHERE si.docstatus = 1
+              AND si.posting_date >= %(from_date)s
+              AND si_item.item_code IS NOT NULL
+              AND si_item.item_code != ''
+            GROUP BY si_item.item_code
+            ORDER BY SUM(si_item.qty) DESC, si_item.item_code ASC
+            LIMIT %(top_n)s
+            """,
+            {"from_date": new_since, "top_n": bestseller_top_n},
+        )
     )
 
-    sales_by_item: Dict[str, float] = {
-        row["item_code"]: flt(row["qty"]) for row in sales_rows if row.get("item_code")
-    }
-
-    # Determine bestseller cutoff
-    sorted_items = sorted(sales_by_item.items(), key=lambda x: x[1], reverse=True)
-    bestseller_codes = {code for code, _ in sorted_items[:bestseller_top_n]}
-
     # Consider only Items that have a published Website Item
     website_items = frappe.get_all(
         "Website Item",
         filters={"published": 1},
-        fields=["name", "item_code"],
+        fields=["name", "item_code", "custom_consumer_discount"],
     )
 
-    item_codes = {wi["item_code"] for wi in website_items if wi.get("item_code")}
+    # First Website Item per item_code wins, matching the previous lookup order
+    discount_by_code: Dict[str, float] = {}
+    for wi in website_items:
+        if wi.get("item_code") and wi["item_code"] not in discount_by_code:
+            discount_by_code[wi["item_code"]] = flt(wi.get("custom_consumer_discount"))
+
+    item_codes = set(discount_by_code)
     if not item_codes:
         return
 
@@ -585,54 +757,8 @@ def recompute_item_badges() -> None:
         row["item_code"]: flt(row["qty"]) for row in bin_rows if row.get("item_code")
     }
 
-    # Helper to upsert an automatic badge row on Item
-    def upsert_auto_badge(item_name: str, badge_type: str) -> None:
-        item_doc = frappe.get_doc("Item", item_name)
-
-        # Remove any auto rows of this type that might be duplicated
-        remaining = []
-        exists = False
-        for row in item_doc.get("badges") or []:
-            if row.get("badge_type") == badge_type and row.get("source") == "Auto":
-                if not exists:
-                    exists = True
-                    remaining.append(row)
-                # drop extras
-            else:
-                remaining.append(row)
-
-        item_doc.set("badges", remaining)
-
-        if not exists:
-            item_doc.append(
-                "badges",
-                {
-                    "badge_type": badge_type,
-                    "source": "Auto",
-                },
-            )
-
-        item_doc.flags.ignore_validate = True
-        item_doc.flags.ignore_permissions = True
-        item_doc.save(ignore_permissions=True)
-
-    # Helper to drop auto badge if rule no longer applies
-    def clear_auto_badge(item_name: str, badge_type: str) -> None:
-        item_doc = frappe.get_doc("Item", item_name)
-        new_rows = [
-            row
-            for row in (item_doc.get("badges") or [])
-            if not (row.get("badge_type") == badge_type and row.get("source") == "Auto")
-        ]
-        if len(new_rows) == len(item_doc.get("badges") or []):
-            return
-
-        item_doc.set("badges", new_rows)
-        item_doc.flags.ignore_validate = True
-        item_doc.flags.ignore_permissions = True
-        item_doc.save(ignore_permissions=True)
-
-    # Compute per-item flags and upsert/clear automatic badges
+    # Compute the full set of automatic badges per item
+    desired: List[Tuple[str, str]] = []
     for item in items:
         code = item["name"]
 
@@ -644,36 +770,104 @@ def recompute_item_badges() -> None:
             is_new = False
 
         if is_new:
-            upsert_auto_badge(code, "New")
-        else:
-            clear_auto_badge(code, "New")
+            desired.append((code, "New"))
 
         # Bestseller: in top N by qty sold
         if code in bestseller_codes:
-            upsert_auto_badge(code, "Bestseller")
-        else:
-            clear_auto_badge(code, "Bestseller")
+            desired.append((code, "Bestseller"))
 
         # On Sale: use Website Item.custom_consumer_discount as simple proxy
-        discount = None
-        wi_rows = [wi for wi in website_items if wi["item_code"] == code]
-        if wi_rows:
-            discount = frappe.db.get_value(
-                "Website Item",
-                wi_rows[0]["name"],
-                "custom_consumer_discount",
-            )
-        if flt(discount) > 0:
-            upsert_auto_badge(code, "On Sale")
-        else:
-            clear_auto_badge(code, "On Sale")
+        if discount_by_code.get(code, 0) > 0:
+            desired.append((code, "On Sale"))
 
         # Low Stock: only for stock items with total qty below threshold
         total_qty = qty_by_item.get(code, 0.0)
         if item.get("is_stock_item") and total_qty > 0 and total_qty <= low_stock_threshold:
-            upsert_auto_badge(code, "Low Stock")
-        else:
-            clear_auto_badge(code, "Low Stock")
+            desired.append((code, "Low Stock"))
+
+    _replace_auto_badges([item["name"] for item in items], desired)
+
+
+def _replace_auto_badges(item_codes: List[str], desired: List[Tuple[str, str]]) -> None:
+    """Bring the automatic Item badges for `item_codes` in line with `desired`.
+
+    Current Auto rows are loaded in one query and diffed against `desired`, so
+    only badges that actually changed are deleted or inserted. Manual rows are
+    left untouched; new automatic rows are appended after the highest existing
+    idx on each Item so the child table order stays stable.
+    """
+
+    if not item_codes:
+        return
+
+    current_counts = {
+        (parent, badge_type): cint(count)
+        for parent, badge_type, count in frappe.db.sql(
+            """
+            SELECT parent, badge_type, COUNT(*)
+            FROM `tabItem Badge`
+            WHERE parenttype = 'Item'
+              AND parentfield = 'badges'
+              AND source = 'Auto'
+              AND parent IN %(items)s
+            GROUP BY parent, badge_type
+            """,
+            {"items": tuple(item_codes)},
+        )
+    }
+
+    # Duplicated Auto rows are rewritten as a single row.
+    duplicates = {pair for pair, count in current_counts.items() if count > 1}
+    desired_set = set(desired)
+    to_remove = (set(current_counts) - desired_set) | duplicates
+    to_add = [pair for pair in dict.fromkeys(desired) if pair not in current_counts or pair in duplicates]
+
+    if not to_remove and not to_add:
+        return
+
+    if to_remove:
+        frappe.db.sql(
+            """
+            DELETE FROM `tabItem Badge`
+            WHERE parenttype = 'Item'
+              AND parentfield = 'badges'
+              AND source = 'Auto'
+              AND (parent, badge_type) IN %(pairs)s
+            """,
+            {"pairs": tuple(to_remove)},
+        )
+
+    if to_add:
+        next_idx: Dict[str, int] = {
+            row[0]: cint(row[1])
+            for row in frappe.db.sql(
+                """
+                SELECT parent, MAX(idx)
+                FROM `tabItem Badge`
+                WHERE parenttype = 'Item'
+                  AND parentfield = 'badges'
+                  AND parent IN %(items)s
+                GROUP BY parent
+                """,
+                {"items": tuple({code for code, _ in to_add})},
+            )
+        }
+
+        names = _generate_row_names(len(to_add))
+        values = []
+        for code, badge_type in to_add:
+            next_idx[code] = next_idx.get(code, 0) + 1
+            values.append((next(names), code, "Item", "badges", badge_type, "Auto", next_idx[code]))
+
+        frappe.db.bulk_insert(
+            "Item Badge",
+            fields=["name", "parent", "parenttype", "parentfield", "badge_type", "source", "idx"],
+            values=values,
+        )
+
+    # Bulk SQL skips Item.on_update, so refresh the derived Website Item rows here.
+    rebuild_filterable_badges()
+    clear_filter_facets_cache()
 
 
 @frappe.whitelist(allow_guest=True)
@@ -689,17 +883,7 @@ def get_item_badges(item_codes: Any) -> Dict[str, List[Dict[str, Any]]]:
         default=1,
     )
 
-    # Normalize input (may be JSON string)
-    if isinstance(item_codes, str):
-        try:
-            import json as _json
-
-            item_codes = _json.loads(item_codes)
-        except Exception:
-            item_codes = [item_codes]
-
-    if not isinstance(item_codes, (list, tuple)):
-        item_codes = [item_codes]
+    item_codes = _parse_item_codes(item_codes)
 
     if not item_codes:
         return {}
@@ -707,54 +891,44 @@ def get_item_badges(item_codes: Any) -> Dict[str, List[Dict[str, Any]]]:
     if not show_badges:
         return {code: [] for code in item_codes}
 
-    website_items = frappe.get_all(
-        "Website Item",
-        filters={"item_code": ["in", list(item_codes)], "published": 1},
-        fields=["name", "item_code"],
-    )
-
-    by_code: Dict[str, str] = {row["item_code"]: row["item_code"] for row in website_items}
-    if not by_code:
-        return {}
-
-    items = frappe.get_all(
-        "Item",
-        filters={"name": ["in", list(by_code.keys())]},
-        fields=["name"],
-    )
-
-    result: Dict[str, List[Dict[str, Any]]] = {code: [] for code in item_codes}
-
-    if not items:
-        return result
-
-    badge_rows = frappe.get_all(
-        "Item Badge",
-        filters={"parent": ["in", [i["name"] for i in items]]},
-        fields=["parent", "badge_type", "source", "valid_from", "valid_upto"],
-        order_by="idx asc",
+    # Only codes with a published Website Item get a key, as before. Item Badge
+    # rows hang directly off Item (parent = item_code); the DISTINCT derived
+    # table avoids duplicating badges when an item has several Website Items,
+    # and the LEFT JOIN keeps published items that have no active badge.
+    badge_rows = frappe.db.sql(
+        """
+        SELECT wi.item_code, ib.badge_type, ib.source, ib.valid_from, ib.valid_upto
+        FROM (
+            SELECT DISTINCT item_code
+            FROM `tabWebsite Item`
+            WHERE item_code IN %(item_codes)s
+              AND published = 1
+        ) wi
+        LEFT JOIN `tabItem Badge` ib
+          ON ib.parent = wi.item_code
+         AND ib.parenttype = 'Item'
+         AND ib.parentfield = 'badges'
+         AND ib.badge_type IS NOT NULL
+         AND ib.badge_type != ''
+         AND (ib.valid_from IS NULL OR ib.valid_from <= %(today)s)
+         AND (ib.valid_upto IS NULL OR ib.valid_upto >= %(today)s)
+        ORDER BY wi.item_code, ib.idx ASC
+        """,
+        {"item_codes": tuple(item_codes), "today": nowdate()},
     )
 
-    parent_to_code = {row["name"]: row["name"] for row in items}
-
-    for row in badge_rows:
-        parent_item = row["parent"]
-        code = parent_to_code.get(parent_item)
-        if not code:
-            continue
-        if not row.get("badge_type"):
-            continue
-        if not _is_date_active(row.get("valid_from"), row.get("valid_upto")):
-            continue
-
-        result.setdefault(code, []).append(
-            {
-                "badge_type": row.get("badge_type"),
-                "source": row.get("source"),
-                "valid_from": row.get("valid_from"),
-                "valid_upto": row.get("valid_upto"),
-            }
-        )
+    result: Dict[str, List[Dict[str, Any]]] = {}
+    for item_code, badge_type, source, valid_from, valid_upto in badge_rows:
+        badges = result.setdefault(item_code, [])
+        if badge_type:
+            badges.append(
+                {
+                    "badge_type": badge_type,
+                    "source": source,
+                    "valid_from": valid_from,
+                    "valid_upto": valid_upto,
+                }
+            )
 
     return result
 
@@ -762,23 +936,8 @@ def get_item_badges(item_codes: Any) -> Dict[str, List[Dict[str, Any]]]:
 def get_products(query_args=None):
     """Return webshop products with custom filters and customer-group brand restriction."""
 
-    if isinstance(query_args, str):
-        import json
-
-        query_args = json.loads(query_args)
-
-    q = frappe._dict(query_args or {})
-
-    import json as _json
-
-    raw_field_filters = q.get("field_filters") or {}
-    if isinstance(raw_field_filters, str):
-        try:
-            raw_field_filters = _json.loads(raw_field_filters) or {}
-        except Exception:
-            raw_field_filters = {}
-
-    field_filters: Dict[str, Any] = dict(raw_field_filters)
+    q = frappe._dict(_parse_json_dict(query_args))
+    field_filters = _parse_json_dict(q.get("field_filters"))
 
     brand = q.get("brand")
     if brand:
@@ -812,7 +971,7 @@ def get_products(query_args=None):
 
     sub_categories: List[Dict[str, Any]] = []
     if item_group:
-        sub_categories = get_child_groups_for_website(item_group, immediate=True)
+        sub_categories = _get_cached_child_groups(item_group, immediate=True)
 
     engine = ProductQuery()
 
@@ -966,14 +1125,63 @@ def product_search(query, limit=10, fuzzy_search=True):
     return {"from_redisearch": False, "results": results}
 
 
-def _normalize_filter_values(val: Any) -> List[str]:
-    """Helper to coerce single values / JSON strings into a flat list[str]."""
-    import json as _json
+def _get_cached_child_groups(
+    item_group: str, immediate: bool = False, include_self: bool = False
+) -> List[Dict[str, Any]]:
+    """Cached wrapper around webshop's `get_child_groups_for_website`.
+
+    The Item Group tree changes rarely, so results are kept in Redis until
+    an Item Group is saved or deleted.
+    """
+    return frappe.cache().hget(
+        CHILD_GROUPS_CACHE_KEY,
+        f"{item_group}:{cint(immediate)}:{cint(include_self)}",
+        generator=lambda: get_child_groups_for_website(
+            item_group, immediate=immediate, include_self=include_self
+        ),
+    )
+
+
+def clear_child_groups_cache(doc=None, method=None):
+    frappe.cache().delete_key(CHILD_GROUPS_CACHE_KEY)
+
+
+def _parse_json_dict(value: Any) -> Dict[str, Any]:
+    """Return `value` as a new dict the caller may mutate.
+
+    Dicts are shallow-copied, JSON strings are decoded; anything else
+    (including malformed JSON) yields an empty dict.
+    """
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, str) and value:
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+    return {}
+
+
+def _parse_item_codes(value: Any) -> List[Any]:
+    """Coerce an item_codes argument (JSON string, list, tuple or scalar) to a list."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value]
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _normalize_filter_values(val: Any) -> List[str]:
+    """Helper to coerce single values / JSON strings into a flat list[str]."""
     if val is None:
         return []
     if isinstance(val, str):
         try:
-            parsed = _json.loads(val)
+            parsed = json.loads(val)
             if isinstance(parsed, list):
                 return [str(v) for v in parsed]
             return [str(parsed)]
@@ -984,119 +1192,46 @@ def _normalize_filter_values(val: Any) -> List[str]:
     return [str(val)]
 
 
-def _get_item_codes_by_price_range(price_from: Any, price_to: Any) -> List[str]:
-    """Get item_codes from Item Price table that match the price range.
-    
-    This enables SQL-level price filtering via item_code IN subquery.
-    """
-    from frappe.utils import flt
-    
+def _parse_price_bounds(price_from: Any, price_to: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Coerce raw price filter values (possibly single-item lists) to floats or None."""
+
     # Handle list inputs from frontend
     if isinstance(price_from, (list, tuple)) and price_from:
         price_from = price_from[0]
     if isinstance(price_to, (list, tuple)) and price_to:
         price_to = price_to[0]
-    
-    price_from_f = flt(price_from) if price_from else None
-    price_to_f = flt(price_to) if price_to else None
-    
-    # Get active price list from webshop settings
-    price_list = (
-        frappe.db.get_single_value("Webshop Settings", "price_list")
-        or frappe.db.get_single_value("Selling Settings", "selling_price_list")
-        or "Standard Selling"
-    )
-    
-    # Build filters for Item Price query
-    filters = {
-        "selling": 1,
-        "price_list": price_list,
-    }
-    
-    # Query Item Price table with range filters
-    if price_from_f is not None and price_to_f is not None:
-        # Both bounds
-        item_prices = frappe.db.get_all(
-            "Item Price",
-            filters=filters,
-            fields=["item_code", "price_list_rate"],
-        )
-        # Filter in Python since Frappe ORM doesn't support range queries well
-        return [
-            ip["item_code"] 
-            for ip in item_prices 
-            if price_from_f <= flt(ip["price_list_rate"]) <= price_to_f
-        ]
-    elif price_from_f is not None:
-        # Only min price
-        item_prices = frappe.db.get_all(
-            "Item Price",
-            filters=filters,
-            fields=["item_code", "price_list_rate"],
-        )
-        return [
-            ip["item_code"] 
-            for ip in item_prices 
-            if flt(ip["price_list_rate"]) >= price_from_f
-        ]
-    elif price_to_f is not None:
-        # Only max price
-        item_prices = frappe.db.get_all(
-            "Item Price",
-            filters=filters,
-            fields=["item_code", "price_list_rate"],
-        )
-        return [
-            ip["item_code"] 
-            for ip in item_prices 
-            if flt(ip["price_list_rate"]) <= price_to_f
-        ]
-    
-    return []
 
-
-@frappe.request_cache
-def _get_product_price_cached(item_code: str) -> Optional[float]:
-    """Get product price with request-level caching for performance."""
-    from webshop.webshop.product_data_engine.product_info import get_product_info_for_website
-    
-    product_info = get_product_info_for_website(item_code, skip_quotation_creation=True).get("product_info")
-    if product_info and product_info.get("price"):
-        return product_info["price"].get("price_list_rate")
-    return None
+    return (flt(price_from) if price_from else None, flt(price_to) if price_to else None)
 
 
-def _filter_by_price(items, price_from, price_to):
-    """Filter items by price range with caching for performance."""
-    from frappe.utils import flt
-    
-    # Handle case where price values come as lists from frontend
-    if isinstance(price_from, (list, tuple)) and price_from:
-        price_from = price_from[0]
-    if isinstance(price_to, (list, tuple)) and price_to:
-        price_to = price_to[0]
+def _get_item_codes_by_price_range(price_from: Any, price_to: Any) -> List[str]:
+    """Get distinct item_codes from Item Price table that match the price range.
     
-    price_from_f = flt(price_from) if price_from else None
-    price_to_f = flt(price_to) if price_to else None
+    Used where the codes must be handed to ProductQuery as an item_code filter;
+    facet queries use an EXISTS subquery instead.
+    """
+    price_from_f, price_to_f = _parse_price_bounds(price_from, price_to)
     
-    filtered = []
-    for item in items:
-        # Use cached price lookup
-        rate = item.get("price_list_rate")
-        if rate is None:
-            # Try to get from cache
-            rate = _get_product_price_cached(item.get("item_code"))
-            if rate is None:
-                continue
-        
-        rate_f = flt(rate)
-        if price_from_f is not None and rate_f < price_from_f:
-            continue
-        if price_to_f is not None and rate_f > price_to_f:
-            continue
-        filtered.append(item)
+    if price_from_f is None and price_to_f is None:
+        return []
+
+    # Get active price list from webshop settings
+    price_list = _get_selling_price_list()
     
-    return filtered
+    # Build filters for Item Price query; bounds are inclusive on both ends.
+    # Separate >= / <= conditions: frappe only expands "between" for date fields.
+    filters: List[List[Any]] = [
+        ["selling", "=", 1],
+        ["price_list", "=", price_list],
+    ]
+    if price_from_f is not None:
+        filters.append(["price_list_rate", ">=", price_from_f])
+    if price_to_f is not None:
+        filters.append(["price_list_rate", "<=", price_to_f])
+
+    # Let the DB do the range scan (idx_item_price_range) instead of shipping
+    # every Item Price row to Python.
+    return frappe.db.get_all("Item Price", filters=filters, pluck="item_code", distinct=True)
 
 
 def _build_discount_filters(result):
@@ -1112,234 +1247,223 @@ def _build_discount_filters(result):
 def sync_offers_to_filterable_field(doc, method=None):
     """Sync Website Offer child table entries to filterable_offers MultiSelect field.
     
-    Called when Website Item is saved or when Website Offer is modified.
+    Registered on Website Item on_update, which already sees its offer rows.
     This allows ProductQuery to filter by offers using standard Table MultiSelect filtering.
+    The request or job that saved the Website Item owns the commit.
     """
-    if not getattr(doc, "doctype", None):
+    if getattr(doc, "doctype", None) != "Website Item":
         return
-        
-    # Handle Website Item save
-    if doc.doctype == "Website Item":
-        parent = doc.name
-        offer_titles = [o.offer_title for o in (doc.offers or []) if o.offer_title]
-
-        # Update filterable_offers via SQL to avoid mutating the in-memory doc child table
-        # with plain dicts (which breaks update_global_search).
-        frappe.db.sql(
-            "DELETE FROM `tabWebsite Offer` WHERE parent = %(parent)s AND parentfield = 'filterable_offers'",
-            {"parent": parent},
-        )
-        for idx, t in enumerate(offer_titles, 1):
-            frappe.db.sql(
-                """
-                INSERT INTO `tabWebsite Offer` (name, parent, parentfield, parenttype, offer_title, idx)
-                VALUES (%(name)s, %(parent)s, %(parentfield)s, %(parenttype)s, %(offer_title)s, %(idx)s)
-                """,
-                {
-                    "name": frappe.generate_hash(length=10),
-                    "parent": parent,
-                    "parentfield": "filterable_offers",
-                    "parenttype": "Website Item",
-                    "offer_title": t,
-                    "idx": idx,
-                },
-            )
-        frappe.db.commit()
-        
-    # Handle Website Offer save/update
-    elif doc.doctype == "Website Offer":
-        parent = doc.parent
-        parenttype = doc.parenttype
-        if parent and parenttype == "Website Item":
-            wi = frappe.get_doc("Website Item", parent)
-            offer_titles = [o.offer_title for o in (wi.offers or []) if o.offer_title]
-            # Use direct SQL to avoid document API issues with child tables
-            frappe.db.sql(
-                "DELETE FROM `tabWebsite Offer` WHERE parent = %(parent)s AND parentfield = 'filterable_offers'",
-                {"parent": parent}
-            )
-            for idx, t in enumerate(offer_titles, 1):
-                frappe.db.sql(
-                    """
-                    INSERT INTO `tabWebsite Offer` (name, parent, parentfield, parenttype, offer_title, idx)
-                    VALUES (%(name)s, %(parent)s, %(parentfield)s, %(parenttype)s, %(offer_title)s, %(idx)s)
-                    """,
-                    {
-                        "name": frappe.generate_hash(length=10),
-                        "parent": parent,
-                        "parentfield": "filterable_offers",
-                        "parenttype": "Website Item",
-                        "offer_title": t,
-                        "idx": idx,
-                    }
-                )
-            frappe.db.commit()
 
+    offer_titles = [o.offer_title for o in (doc.offers or []) if o.offer_title]
+    before = doc.get_doc_before_save()
+    if before and offer_titles == [o.offer_title for o in (before.offers or []) if o.offer_title]:
+        return
 
-def sync_badges_to_filterable_field(doc, method=None):
-    """Sync Item Badge entries to Website Item's filterable_badges MultiSelect field.
-    
-    Called when Item is saved or when Item Badge is modified.
-    This allows ProductQuery to filter by badges using standard Table MultiSelect filtering.
+    # Update filterable_offers via SQL to avoid mutating the in-memory doc child table
+    # with plain dicts (which breaks update_global_search).
+    _replace_filterable_offers(doc.name, offer_titles)
+
+
+def _generate_row_names(count: int) -> Iterator[str]:
+    """Yield `count` random 10-char hex row names from a single entropy read.
+
+    Same format as frappe.generate_hash(length=10), without one call per row.
     """
-    if not getattr(doc, "doctype", None):
+    token = secrets.token_hex(5 * count)
+    return (token[i : i + 10] for i in range(0, len(token), 10))
+
+
+def _replace_filterable_offers(parent: str, offer_titles: List[str]) -> None:
+    """Replace a Website Item's filterable_offers rows with one DELETE and one bulk INSERT."""
+
+    frappe.db.sql(
+        "DELETE FROM `tabWebsite Offer` WHERE parent = %(parent)s AND parentfield = 'filterable_offers'",
+        {"parent": parent},
+    )
+    if not offer_titles:
         return
-        
-    # Handle Item save
-    if doc.doctype == "Item":
-        badge_types = [b.badge_type for b in (doc.badges or []) if b.badge_type]
-        # Update all linked Website Items
-        website_items = frappe.get_all(
-            "Website Item",
-            filters={"item_code": doc.name},
-            pluck="name"
-        )
-        for wi_name in website_items:
-            # Use direct SQL to avoid document API issues
-            frappe.db.sql(
-                "DELETE FROM `tabItem Badge` WHERE parent = %(parent)s AND parenttype = 'Website Item' AND parentfield = 'filterable_badges'",
-                {"parent": wi_name}
-            )
-            for idx, t in enumerate(badge_types, 1):
-                frappe.db.sql(
-                    """
-                    INSERT INTO `tabItem Badge` (name, parent, parentfield, parenttype, badge_type, idx, source)
-                    VALUES (%(name)s, %(parent)s, %(parentfield)s, %(parenttype)s, %(badge_type)s, %(idx)s, %(source)s)
-                    """,
-                    {
-                        "name": frappe.generate_hash(length=10),
-                        "parent": wi_name,
-                        "parentfield": "filterable_badges",
-                        "parenttype": "Website Item",
-                        "badge_type": t,
-                        "idx": idx,
-                        "source": "Auto",
-                    }
-                )
-        frappe.db.commit()
-            
-    # Handle Item Badge save/update (via parent Item)
-    elif doc.doctype == "Item Badge":
-        parent = doc.parent
-        if parent:
-            item = frappe.get_doc("Item", parent)
-            badge_types = [b.badge_type for b in (item.badges or []) if b.badge_type]
-            website_items = frappe.get_all(
-                "Website Item",
-                filters={"item_code": parent},
-                pluck="name"
-            )
-            for wi_name in website_items:
-                # Use direct SQL to avoid document API issues
-                frappe.db.sql(
-                    "DELETE FROM `tabItem Badge` WHERE parent = %(parent)s AND parenttype = 'Website Item' AND parentfield = 'filterable_badges'",
-                    {"parent": wi_name}
-                )
-                for idx, t in enumerate(badge_types, 1):
-                    frappe.db.sql(
-                        """
-                        INSERT INTO `tabItem Badge` (name, parent, parentfield, parenttype, badge_type, idx, source)
-                        VALUES (%(name)s, %(parent)s, %(parentfield)s, %(parenttype)s, %(badge_type)s, %(idx)s, %(source)s)
-                        """,
-                        {
-                            "name": frappe.generate_hash(length=10),
-                            "parent": wi_name,
-                            "parentfield": "filterable_badges",
-                            "parenttype": "Website Item",
-                            "badge_type": t,
-                            "idx": idx,
-                            "source": "Auto",
-                        }
-                    )
-            frappe.db.commit()
+
+    names = _generate_row_names(len(offer_titles))
+    frappe.db.bulk_insert(
+        "Website Offer",
+        fields=["name", "parent", "parentfield", "parenttype", "offer_title", "idx"],
+        values=[
+            (next(names), parent, "filterable_offers", "Website Item", title, idx)
+            for idx, title in enumerate(offer_titles, 1)
+        ],
+    )
 
 
-@frappe.whitelist()
-def rebuild_filterable_badges() -> None:
-    """Backfill filterable_badges MultiSelect for all Website Items.
+def rebuild_filterable_offers() -> None:
+    """Backfill filterable_offers for all Website Items in two statements.
 
-    This is safe to run multiple times and is intended as an admin/maintenance
-    operation after enabling badge-based filters.
-    Uses direct SQL to avoid document API complexities with child tables.
+    Set-based counterpart of `sync_offers_to_filterable_field` for bulk
+    imports and the nightly repair job. Row names are derived from the source
+    offer row name, which is unique, and idx is renumbered per parent.
     """
 
-    # Get all Website Items and their item_code
+    frappe.db.sql(
+        "DELETE FROM `tabWebsite Offer` WHERE parenttype = 'Website Item' AND parentfield = 'filterable_offers'"
+    )
+    frappe.db.sql(
+        """
+        INSERT INTO `tabWebsite Offer` (name, parent, parentfield, parenttype, offer_title, idx)
+        SELECT
+            SUBSTRING(MD5(CONCAT(name, ':filterable_offers')), 1, 10),
+            parent,
+            'filterable_offers',
+            parenttype,
+            offer_title,
+            ROW_NUMBER() OVER (PARTITION BY parent ORDER BY idx)
+        FROM `tabWebsite Offer`
+        WHERE parenttype = 'Website Item'
+          AND parentfield = 'offers'
+          AND offer_title IS NOT NULL
+          AND offer_title != ''
+        """
+    )
+    frappe.db.commit()
+
+
+def sync_badges_to_filterable_field(doc, method=None):
+    """Sync Item Badge entries to Website Item's filterable_badges MultiSelect field.
+    
+    Registered on Item on_update, which already sees its badge rows.
+    This allows ProductQuery to filter by badges using standard Table MultiSelect filtering.
+    The request or job that saved the Item owns the commit.
+    """
+    if getattr(doc, "doctype", None) != "Item":
+        return
+
+    badge_types = [b.badge_type for b in (doc.badges or []) if b.badge_type]
+    before = doc.get_doc_before_save()
+    if before and badge_types == [b.badge_type for b in (before.badges or []) if b.badge_type]:
+        return
+    # Update all linked Website Items
     website_items = frappe.get_all(
         "Website Item",
-        fields=["name", "item_code"],
+        filters={"item_code": doc.name},
+        pluck="name"
     )
+    _replace_filterable_badges(website_items, badge_types)
+
+
+def _replace_filterable_badges(website_items: List[str], badge_types: List[str]) -> None:
+    """Rewrite filterable_badges rows for the given Website Items.
+
+    Uses direct SQL to avoid document API issues: one DELETE across all
+    Website Items followed by one multi-row INSERT, skipped when every
+    Website Item already carries exactly `badge_types`.
+    """
 
     if not website_items:
         return
 
-    by_item_code: Dict[str, List[str]] = {}
-    for wi in website_items:
-        code = wi.get("item_code")
-        if not code:
-            continue
-        by_item_code.setdefault(code, []).append(wi["name"])
+    current: Dict[str, List[str]] = {wi_name: [] for wi_name in website_items}
+    for parent, badge_type in frappe.db.sql(
+        """
+        SELECT parent, badge_type
+        FROM `tabItem Badge`
+        WHERE parenttype = 'Website Item'
+          AND parentfield = 'filterable_badges'
+          AND parent IN %(parents)s
+        ORDER BY parent, idx
+        """,
+        {"parents": tuple(website_items)},
+    ):
+        current[parent].append(badge_type)
 
-    item_codes = list(by_item_code.keys())
-    if not item_codes:
+    # Most Item saves don't touch badges; skip the DELETE + INSERT entirely then.
+    if all(existing == list(badge_types) for existing in current.values()):
         return
 
-    # Fetch all badges for these Items
-    badge_rows = frappe.get_all(
-        "Item Badge",
-        filters={"parent": ["in", item_codes]},
-        fields=["parent", "badge_type"],
+    frappe.db.sql(
+        """
+        DELETE FROM `tabItem Badge`
+        WHERE parenttype = 'Website Item'
+          AND parentfield = 'filterable_badges'
+          AND parent IN %(parents)s
+        """,
+        {"parents": tuple(website_items)},
     )
 
-    badges_by_item: Dict[str, List[str]] = {}
-    for row in badge_rows:
-        code = row.get("parent")
-        btype = row.get("badge_type")
-        if not code or not btype:
-            continue
-        badges_by_item.setdefault(code, []).append(btype)
+    names = _generate_row_names(len(website_items) * len(badge_types))
+    rows = [
+        (next(names), wi_name, "filterable_badges", "Website Item", t, idx, "Auto")
+        for wi_name in website_items
+        for idx, t in enumerate(badge_types, 1)
+    ]
+    if rows:
+        frappe.db.bulk_insert(
+            "Item Badge",
+            fields=["name", "parent", "parentfield", "parenttype", "badge_type", "idx", "source"],
+            values=rows,
+        )
 
-    # First, clear all existing filterable_badges rows for Website Items
-    frappe.db.sql(
-        "DELETE FROM `tabItem Badge` WHERE parenttype = 'Website Item' AND parentfield = 'filterable_badges'"
-    )
-
-    # Insert new rows directly via SQL
-    idx = 0
-    for item_code, wi_names in by_item_code.items():
-        badge_types = badges_by_item.get(item_code) or []
-        for wi_name in wi_names:
-            for t in badge_types:
-                idx += 1
-                frappe.db.sql(
-                    """
-                    INSERT INTO `tabItem Badge`
-                    (name, parent, parentfield, parenttype, badge_type, idx, source)
-                    VALUES (%(name)s, %(parent)s, %(parentfield)s, %(parenttype)s, %(badge_type)s, %(idx)s, %(source)s)
-                    """,
-                    {
-                        "name": frappe.generate_hash(length=10),
-                        "parent": wi_name,
-                        "parentfield": "filterable_badges",
-                        "parenttype": "Website Item",
-                        "badge_type": t,
-                        "idx": idx,
-                        "source": "Auto",
-                    }
-                )
 
-    frappe.db.commit()
+@frappe.whitelist()
+def rebuild_filterable_badges() -> None:
+    """Backfill filterable_badges MultiSelect for all Website Items.
 
+    This is safe to run multiple times and is intended as an admin/maintenance
+    operation after enabling badge-based filters. Runs as one DELETE plus one
+    INSERT ... SELECT so the whole rebuild stays inside the database; row names
+    are derived from the Website Item and source badge row, which is unique.
+
+    Both statements run in the current transaction and are committed once,
+    so readers never observe the emptied table and a failed INSERT leaves
+    the previous rows in place.
+    """
+
+    try:
+        frappe.db.sql(
+            "DELETE FROM `tabItem Badge` WHERE parenttype = 'Website Item' AND parentfield = 'filterable_badges'"
+        )
+        frappe.db.sql(
+            """
+            INSERT INTO `tabItem Badge` (name, parent, parentfield, parenttype, badge_type, idx, source)
+            SELECT
+                SUBSTRING(MD5(CONCAT(wi.name, ':', ib.name)), 1, 10),
+                wi.name,
+                'filterable_badges',
+                'Website Item',
+                ib.badge_type,
+                ROW_NUMBER() OVER (PARTITION BY wi.name ORDER BY ib.idx),
+                'Auto'
+            FROM `tabWebsite Item` wi
+            JOIN `tabItem Badge` ib
+              ON ib.parent = wi.item_code
+             AND ib.parenttype = 'Item'
+             AND ib.parentfield = 'badges'
+            WHERE ib.badge_type IS NOT NULL
+              AND ib.badge_type != ''
+            """
+        )
+    except Exception:
+        frappe.db.rollback()
+        raise
+
+    frappe.db.commit()
 
 
 def _resolve_price_bucket(name: str) -> Tuple[Optional[float], Optional[float]]:
     """Look up Catalog Price Range by name and return (from_amount, to_amount).
 
-    If not found, returns (None, None).
+    If not found, returns (None, None). Buckets are configuration data, so
+    lookups are kept in Redis until a Catalog Price Range is saved or deleted.
     """
 
     if not name:
         return None, None
 
+    return frappe.cache().hget(
+        PRICE_BUCKET_CACHE_KEY,
+        name,
+        generator=lambda: _load_price_bucket(name),
+    )
+
+
+def _load_price_bucket(name: str) -> Tuple[Optional[float], Optional[float]]:
     doc = frappe.db.get_value(
         "Catalog Price Range",
         name,
@@ -1355,133 +1479,91 @@ def _resolve_price_bucket(name: str) -> Tuple[Optional[float], Optional[float]]:
 
 @frappe.whitelist(allow_guest=True)
 def get_template_price_range(template_item_code: str) -> Dict[str, float]:
-    price_list = (
-        frappe.db.get_single_value("Webshop Settings", "price_list")
-        or frappe.db.get_single_value("Selling Settings", "selling_price_list")
-        or "Standard Selling"
-    )
-
-    variants = frappe.get_all(
-        "Item",
-        filters={"variant_of": template_item_code},
-        pluck="name",
-    )
+    price_list = _get_selling_price_list()
 
-    if not variants:
-        return {"min": 0.0, "max": 0.0}
-
-    prices = frappe.get_all(
-        "Item Price",
-        filters={
-            "item_code": ["in", variants],
-            "selling": 1,
-            "price_list": price_list,
-        },
-        fields=["price_list_rate"],
+    row = frappe.db.sql(
+        """
+        SELECT MIN(ip.price_list_rate), MAX(ip.price_list_rate)
+        FROM `tabItem Price` ip
+        JOIN `tabItem` i ON i.name = ip.item_code
+        WHERE i.variant_of = %(template)s
+          AND ip.selling = 1
+          AND ip.price_list = %(price_list)s
+        """,
+        {"template": template_item_code, "price_list": price_list},
     )
-
-    rates = [p["price_list_rate"] for p in prices if p.get("price_list_rate") is not None]
-    if not rates:
-        return {"min": 0.0, "max": 0.0}
-
-    return {"min": float(min(rates)), "max": float(max(rates))}
+    return _min_max_or_zero(row)
 
 
 @frappe.whitelist(allow_guest=True)
 def get_template_discount_range(template_item_code: str) -> Dict[str, float]:
-    variants = frappe.get_all(
-        "Item",
-        filters={"variant_of": template_item_code},
-        pluck="name",
+    row = frappe.db.sql(
+        """
+        SELECT MIN(wi.custom_consumer_discount), MAX(wi.custom_consumer_discount)
+        FROM `tabWebsite Item` wi
+        JOIN `tabItem` i ON i.name = wi.item_code
+        WHERE i.variant_of = %(template)s
+        """,
+        {"template": template_item_code},
     )
+    return _min_max_or_zero(row)
 
-    if not variants:
-        return {"min": 0.0, "max": 0.0}
-
-    rows = frappe.get_all(
-        "Website Item",
-        filters={"item_code": ["in", variants]},
-        fields=["custom_consumer_discount"],
-    )
 
-    discounts = [r["custom_consumer_discount"] for r in rows if r.get("custom_consumer_discount") is not None]
-    if not discounts:
+def _min_max_or_zero(row) -> Dict[str, float]:
+    """Normalize a single (MIN, MAX) SQL row; NULLs (no data) become 0.0."""
+    min_value, max_value = row[0] if row else (None, None)
+    if min_value is None or max_value is None:
         return {"min": 0.0, "max": 0.0}
-
-    return {"min": float(min(discounts)), "max": float(max(discounts))}
+    return {"min": float(min_value), "max": float(max_value)}
 
 
 @frappe.whitelist(allow_guest=True)
 def get_variants_for_template(template_item_code: str) -> List[Dict[str, Any]]:
-    variants = frappe.get_all(
-        "Item",
-        filters={"variant_of": template_item_code},
-        fields=["name", "item_name"],
-    )
-
-    if not variants:
-        return []
-
-    variant_names = [v["name"] for v in variants]
-
-    attrs = frappe.get_all(
-        "Item Variant Attribute",
-        filters={"parent": ["in", variant_names]},
-        fields=["parent", "attribute", "attribute_value"],
-    )
-
-    attributes_by_variant: Dict[str, Dict[str, str]] = {}
-    for row in attrs:
-        parent = row["parent"]
-        if parent not in attributes_by_variant:
-            attributes_by_variant[parent] = {}
-        attributes_by_variant[parent][row["attribute"]] = row["attribute_value"]
+    price_list = _get_selling_price_list()
 
-    price_list = (
-        frappe.db.get_single_value("Webshop Settings", "price_list")
-        or frappe.db.get_single_value("Selling Settings", "selling_price_list")
-        or "Standard Selling"
-    )
-
-    prices = frappe.get_all(
-        "Item Price",
-        filters={
-            "item_code": ["in", variant_names],
-            "selling": 1,
-            "price_list": price_list,
-        },
-        fields=["item_code", "price_list_rate"],
-    )
-
-    price_by_item: Dict[str, float] = {}
-    for row in prices:
-        if row.get("price_list_rate") is not None:
-            price_by_item[row["item_code"]] = float(row["price_list_rate"])
-
-    discount_rows = frappe.get_all(
-        "Website Item",
-        filters={"item_code": ["in", variant_names]},
-        fields=["item_code", "custom_consumer_discount"],
+    # One round-trip for variants, their attributes, price and consumer discount.
+    rows = frappe.db.sql(
+        """
+        SELECT
+            i.name,
+            i.item_name,
+            a.attribute,
+            a.attribute_value,
+            ip.price_list_rate,
+            wi.name AS website_item,
+            wi.custom_consumer_discount
+        FROM `tabItem` i
+        LEFT JOIN `tabItem Variant Attribute` a
+            ON a.parent = i.name AND a.parenttype = 'Item'
+        LEFT JOIN `tabItem Price` ip
+            ON ip.item_code = i.name AND ip.selling = 1 AND ip.price_list = %(price_list)s
+        LEFT JOIN `tabWebsite Item` wi
+            ON wi.item_code = i.name
+        WHERE i.variant_of = %(template)s
+        ORDER BY i.modified DESC, i.name, a.idx
+        """,
+        {"template": template_item_code, "price_list": price_list},
     )
 
-    discount_by_item: Dict[str, Optional[float]] = {}
-    for row in discount_rows:
-        discount_by_item[row["item_code"]] = row.get("custom_consumer_discount")
-
-    result: List[Dict[str, Any]] = []
-    for v in variants:
-        name = v["name"]
-        result.append(
-            {
+    variants: Dict[str, Dict[str, Any]] = {}
+    for name, item_name, attribute, attribute_value, rate, website_item, discount in rows:
+        variant = variants.get(name)
+        if variant is None:
+            variant = variants[name] = {
                 "item_code": name,
-                "item_name": v.get("item_name"),
-                "attributes": attributes_by_variant.get(name, {}),
-                "price": price_by_item.get(name),
-                "consumer_discount": discount_by_item.get(name),
+                "item_name": item_name,
+                "attributes": {},
+                "price": None,
+                "consumer_discount": None,
             }
-        )
+        if attribute:
+            variant["attributes"][attribute] = attribute_value
+        if rate is not None:
+            variant["price"] = float(rate)
+        if website_item:
+            variant["consumer_discount"] = discount
 
-    return result
+    return list(variants.values())
 
 
 @frappe.whitelist(allow_guest=True)
@@ -1492,59 +1574,30 @@ def get_item_offers(item_codes: Any) -> Dict[str, Any]:
     This is used to display Available Offers on product cards in list/grid view.
     """
 
-    # Normalize input (may be JSON string)
-    if isinstance(item_codes, str):
-        try:
-            import json as _json
-            item_codes = _json.loads(item_codes)
-        except Exception:
-            item_codes = [item_codes]
-
-    if not isinstance(item_codes, (list, tuple)):
-        item_codes = [item_codes]
+    item_codes = _parse_item_codes(item_codes)
 
     if not item_codes:
         return {}
 
-    # Map Website Item name by item_code
-    website_items = frappe.get_all(
-        "Website Item",
-        filters={"item_code": ["in", list(item_codes)]},
-        fields=["name", "item_code"],
-    )
-
-    by_code: Dict[str, Any] = {wi["item_code"]: wi["name"] for wi in website_items}
-
     result: Dict[str, Any] = {code: [] for code in item_codes}
 
-    if not by_code:
-        return result
-
-    # Fetch child offers for all Website Items
-    offers = frappe.get_all(
-        "Website Offer",
-        filters={
-            "parent": ["in", list(by_code.values())],
-            "parenttype": "Website Item",
-            "parentfield": "offers",
-        },
-        fields=["name", "offer_title", "offer_subtitle", "parent"],
-        order_by="idx asc",
+    offers = frappe.db.sql(
+        """
+        SELECT wi.item_code, o.name, o.offer_title, o.offer_subtitle
+        FROM `tabWebsite Item` wi
+        JOIN `tabWebsite Offer` o
+          ON o.parent = wi.name
+         AND o.parenttype = 'Website Item'
+         AND o.parentfield = 'offers'
+        WHERE wi.item_code IN %(codes)s
+        ORDER BY o.idx ASC
+        """,
+        {"codes": tuple(item_codes)},
     )
 
-    # Reverse map parent -> item_code
-    parent_to_code = {v: k for k, v in by_code.items()}
-
-    for row in offers:
-        code = parent_to_code.get(row["parent"])
-        if not code:
-            continue
-        result.setdefault(code, []).append(
-            {
-                "name": row.get("name"),
-                "offer_title": row.get("offer_title"),
-                "offer_subtitle": row.get("offer_subtitle"),
-            }
+    for item_code, name, offer_title, offer_subtitle in offers:
+        result.setdefault(item_code, []).append(
+            {"name": name, "offer_title": offer_title, "offer_subtitle": offer_subtitle}
         )
 
     return result
@@ -1561,23 +1614,23 @@ def sync_consumer_discount_to_website_item(doc, method: Optional[str] = None) ->
     if not getattr(doc, "doctype", None) == "Item":
         return
 
+    # New Items and edited discounts report a change; plain Item saves don't.
+    if not doc.has_value_changed("custom_consumer_discount"):
+        return
+
     discount = doc.get("custom_consumer_discount")
 
-    # Find all Website Items that point to this Item via item_code
-    website_item_names = frappe.get_all(
+    # Set or clear the consumer discount on every Website Item that points to
+    # this Item in a single UPDATE (set_value with filters also clears the
+    # Website Item document cache).
+    frappe.db.set_value(
         "Website Item",
-        filters={"item_code": doc.name},
-        pluck="name",
+        {"item_code": doc.name},
+        "custom_consumer_discount",
+        discount,
+        update_modified=False,
     )
 
-    if not website_item_names:
-        return
-
-    for wi_name in website_item_names:
-        wi = frappe.get_doc("Website Item", wi_name)
-        # Set or clear the consumer discount field to mirror Item
-        wi.db_set("custom_consumer_discount", discount, update_modified=False)
-
 
 @frappe.whitelist(allow_guest=True)
 def get_consumer_discounts(item_codes: Any) -> Dict[str, Optional[float]]:
@@ -1587,31 +1640,21 @@ def get_consumer_discounts(item_codes: Any) -> Dict[str, Optional[float]]:
     product cards. Does not affect any pricing logic.
     """
 
-    # item_codes may come as JSON string, list, or tuple
-    if isinstance(item_codes, str):
-        try:
-            import json as _json
-            item_codes = _json.loads(item_codes)
-        except Exception:
-            item_codes = [item_codes]
-
-    if not isinstance(item_codes, (list, tuple)):
-        item_codes = [item_codes]
+    item_codes = _parse_item_codes(item_codes)
 
     if not item_codes:
         return {}
 
-    rows = frappe.get_all(
-        "Website Item",
-        filters={"item_code": ["in", list(item_codes)]},
-        fields=["item_code", "custom_consumer_discount"],
+    rows = frappe.db.sql(
+        """
+        SELECT item_code, custom_consumer_discount
+        FROM `tabWebsite Item`
+        WHERE item_code IN %(codes)s
+        """,
+        {"codes": tuple(item_codes)},
     )
 
-    result: Dict[str, Optional[float]] = {}
-    for row in rows:
-        result[row["item_code"]] = row.get("custom_consumer_discount")
-
-    return result
+    return {item_code: discount for item_code, discount in rows}
 
 
 @frappe.whitelist(allow_guest=True)
@@ -1621,32 +1664,21 @@ def get_item_brands(item_codes: Any) -> Dict[str, Optional[str]]:
     Used by the frontend to render brand labels on product cards.
     """
 
-    # Normalize input (may be JSON string)
-    if isinstance(item_codes, str):
-        try:
-            import json as _json
-            item_codes = _json.loads(item_codes)
-        except Exception:
-            item_codes = [item_codes]
-
-    if not isinstance(item_codes, (list, tuple)):
-        item_codes = [item_codes]
+    item_codes = _parse_item_codes(item_codes)
 
     if not item_codes:
         return {}
 
-    # Get Website Items with their brand
-    website_items = frappe.get_all(
-        "Website Item",
-        filters={"item_code": ["in", list(item_codes)]},
-        fields=["item_code", "brand"],
+    rows = frappe.db.sql(
+        """
+        SELECT item_code, brand
+        FROM `tabWebsite Item`
+        WHERE item_code IN %(codes)s
+        """,
+        {"codes": tuple(item_codes)},
     )
 
-    result: Dict[str, Optional[str]] = {}
-    for row in website_items:
-        result[row["item_code"]] = row.get("brand")
-
-    return result
+    return {item_code: brand for item_code, brand in rows}
 
 
 def _get_portal_order_doc(order_name: str, order_doctype: Optional[str] = None):
@@ -63,9 +63,9 @@ def get_brand_filter_context():
     )
 
 
-def apply_brand_filter(field_filters=None):
+def apply_brand_filter(field_filters=None, context=None):
     filters = dict(field_filters or {})
-    context = get_brand_filter_context()
+    context = context or get_brand_filter_context()
 
     if not context.restricted:
         return filters, False, context
@@ -66,23 +66,58 @@ override_doctype_templates = {
 # DocType event hooks
 doc_events = {
     "Item": {
-        # Whenever an Item is updated, sync its Consumer Discount to linked Website Items
+        # Whenever an Item is updated, sync its Consumer Discount and badges
+        # (Item Badge rows are saved through the Item) to linked Website Items
         "on_update": [
             "catalog_extensions.api.sync_consumer_discount_to_website_item",
             "catalog_extensions.api.sync_badges_to_filterable_field",
+            "catalog_extensions.api.clear_filter_facets_cache",
         ]
     },
     "Website Item": {
-        # Sync filterable fields when Website Item is saved
-        "on_update": "catalog_extensions.api.sync_offers_to_filterable_field",
+        # Sync filterable fields when Website Item is saved; Website Offer rows
+        # are saved through their parent, so they need no hook of their own
+        "on_update": [
+            "catalog_extensions.api.sync_offers_to_filterable_field",
+            "catalog_extensions.api.clear_filter_facets_cache",
+        ],
+        "on_trash": "catalog_extensions.api.clear_filter_facets_cache",
+    },
+    "Item Price": {
+        # Price facets and slider bounds depend on Item Price rows
+        "on_update": "catalog_extensions.api.clear_filter_facets_cache",
+        "on_trash": "catalog_extensions.api.clear_filter_facets_cache",
+    },
+    "Catalog Price Range": {
+        # Price range facets are cached; drop them when ranges change
+        "on_update": [
+            "catalog_extensions.api.clear_price_facets_template_cache",
+            "catalog_extensions.api.clear_filter_facets_cache",
+        ],
+        "on_trash": [
+            "catalog_extensions.api.clear_price_facets_template_cache",
+            "catalog_extensions.api.clear_filter_facets_cache",
+        ],
+    },
+    "Item Group": {
+        # Child group lookups for listings and facets are cached per tree shape
+        "on_update": [
+            "catalog_extensions.api.clear_child_groups_cache",
+            "catalog_extensions.api.clear_filter_facets_cache",
+        ],
+        "on_trash": [
+            "catalog_extensions.api.clear_child_groups_cache",
+            "catalog_extensions.api.clear_filter_facets_cache",
+        ],
+    },
+    "Webshop Settings": {
+        "on_update": "catalog_extensions.api.clear_price_list_cache",
     },
-    "Website Offer": {
-        # Sync when individual Website Offer rows are changed
-        "on_update": "catalog_extensions.api.sync_offers_to_filterable_field",
+    "Selling Settings": {
+        "on_update": "catalog_extensions.api.clear_price_list_cache",
     },
-    "Item Badge": {
-        # Sync when Item Badge rows are changed
-        "on_update": "catalog_extensions.api.sync_badges_to_filterable_field",
+    "Webshop Simple Checkout Settings": {
+        "on_update": "catalog_extensions.simple_checkout.clear_settings_missing_flag",
     },
     "Customer Group Brand Mapping": {
         "validate": "catalog_extensions.brand_filtering.validate_customer_group_brand_mapping",
@@ -247,6 +282,8 @@ override_doctype_class = {
 scheduler_events = {
 	"daily": [
 		"catalog_extensions.api.recompute_item_badges",
+		"catalog_extensions.api.rebuild_filterable_offers",
+		"catalog_extensions.api.rebuild_filter_facets_snapshot",
 	],
 }
 
@@ -1,24 +1,36 @@
 import frappe
+import functools
+import importlib.util
 import os
-import sys
 
 from catalog_extensions.install_support import assert_install_prerequisites, assert_setup_complete
 from catalog_extensions.printing import ensure_order_receipt_print_format
 
 
+def _load_deploy_module(deploy_path, module_name):
+    spec = importlib.util.spec_from_file_location(
+        f"catalog_extensions_deploy.{module_name}", os.path.join(deploy_path, f"{module_name}.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@functools.lru_cache(maxsize=1)
 def _import_setup_modules():
-    """Import setup modules from deploy/ directory (at app root, not inside package)."""
+    """Import setup modules from deploy/ directory (at app root, not inside package).
+
+    Only called from the install/migrate hooks. The modules are loaded by file
+    path, so sys.path is left untouched for every other import in the worker.
+    """
     # Get path to catalog_extensions app root
     app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     deploy_path = os.path.join(app_root, "deploy")
-    
-    if deploy_path not in sys.path:
-        sys.path.insert(0, deploy_path)
-    
-    import setup_doctypes
-    import setup_custom_fields
-    
-    return setup_doctypes, setup_custom_fields
+
+    return (
+        _load_deploy_module(deploy_path, "setup_doctypes"),
+        _load_deploy_module(deploy_path, "setup_custom_fields"),
+    )
 
 
 def _run_setup():
@@ -40,14 +52,14 @@ def _run_setup():
     # Create Customer Group Brand Mapping DocType used by brand filtering
     setup_doctypes.create_customer_group_brand_mapping_doctype(frappe)
 
+    # Ensure Item Badge child DocType is present before fields that link to it
+    setup_custom_fields.sync_item_badge_doctype(frappe)
+
     # Create custom fields on Item, Website Item
     setup_custom_fields.setup_item_fields(frappe)
     setup_custom_fields.setup_website_item_fields(frappe)
     setup_custom_fields.setup_checkout_mode_fields(frappe)
 
-    # Ensure Item Badge child DocType is present
-    setup_custom_fields.sync_item_badge_doctype(frappe)
-
     # Create performance indexes for custom filter queries
     setup_custom_fields.setup_performance_indexes(frappe)
 
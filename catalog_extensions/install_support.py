@@ -33,7 +33,11 @@ REQUIRED_CUSTOM_FIELDS = (
 REQUIRED_INDEXES = (
     ("Website Offer", "idx_website_offer_filter"),
     ("Item Badge", "idx_item_badge_filter"),
+    ("Item Badge", "idx_item_badge_parent"),
     ("Item Price", "idx_item_price_filter"),
+    ("Item Price", "idx_item_price_range"),
+    ("Website Item", "idx_website_item_facets"),
+    ("Website Item", "idx_website_item_brand"),
 )
 
 
@@ -102,16 +106,7 @@ def verify_setup_artifacts() -> tuple[list[str], list[str]]:
         errors.append(f"Missing Print Format: {ORDER_RECEIPT_PRINT_FORMAT}")
 
     for table_name, index_name in REQUIRED_INDEXES:
-        rows = frappe.db.sql(
-            """
-            SELECT 1
-            FROM information_schema.STATISTICS
-            WHERE table_schema = DATABASE()
-              AND table_name = %s
-              AND index_name = %s
-            """,
-            (f"tab{table_name}", index_name),
-        )
+        rows = frappe.db.sql(f"SHOW INDEX FROM `tab{table_name}` WHERE Key_name = %s", (index_name,))
         if not rows:
             errors.append(f"Missing Index: {index_name} on {table_name}")
 
@@ -16,6 +16,12 @@ from webshop.webshop.doctype.webshop_settings.webshop_settings import get_shoppi
 PAYMENT_MODE_PREPAID = "PREPAID"
 PAYMENT_MODE_COD = "COD"
 PAYMENT_MODE_OPTIONS = (PAYMENT_MODE_PREPAID, PAYMENT_MODE_COD)
+_SETTINGS_SENTINEL = object()
+SETTINGS_MISSING_CACHE_KEY = "catalog_extensions:simple_checkout_settings_missing"
+SETTINGS_MISSING_CACHE_TTL = 300
+
+# site -> (settings.modified, settings-derived flags); see _get_static_checkout_flags
+_FLAGS_CACHE: dict[str, tuple] = {}
 
 
 def get_payment_mode_for_doc(doc) -> str:
@@ -44,13 +50,32 @@ def _get_settings():
 	"""Fetch webshop checkout settings if the doctype exists.
 
 	Returns None if the doctype/record is missing so that core behaviour is preserved.
+	The result (including a missing doctype) is memoized on frappe.local, so the
+	many helpers that call this during one checkout request share a single lookup.
+	A miss is also remembered in Redis for a few minutes so sites without the
+	settings doc don't pay for a failed lookup and exception on every request.
 	"""
+	settings = getattr(frappe.local, "_simple_checkout_settings", _SETTINGS_SENTINEL)
+	if settings is not _SETTINGS_SENTINEL:
+		return settings
+
 	doctype = "Webshop Simple Checkout Settings"
-	try:
-		return frappe.get_cached_doc(doctype)
-	except (frappe.DoesNotExistError, frappe.PermissionError):
-		# Settings not configured; behave like core
-		return None
+	if frappe.cache().get_value(SETTINGS_MISSING_CACHE_KEY):
+		settings = None
+	else:
+		try:
+			settings = frappe.get_cached_doc(doctype)
+		except (frappe.DoesNotExistError, frappe.PermissionError):
+			# Settings not configured; behave like core
+			settings = None
+			frappe.cache().set_value(SETTINGS_MISSING_CACHE_KEY, 1, expires_in_sec=SETTINGS_MISSING_CACHE_TTL)
+
+	frappe.local._simple_checkout_settings = settings
+	return settings
+
+
+def clear_settings_missing_flag(doc=None, method=None):
+	frappe.cache().delete_value(SETTINGS_MISSING_CACHE_KEY)
 
 
 def _is_shipping_section_disabled(settings=None) -> bool:
@@ -156,95 +181,117 @@ def _resolve_checkout_payment_mode(quotation=None, settings=None, requested_mode
 	return enabled_modes[0]
 
 
-def _ensure_defaults_on_quotation(quotation, settings):
-	"""Ensure address and payment defaults are set on the given cart quotation.
+def _ensure_minimal_address(party):
+	"""Ensure at least one Address exists and is linked to the party.
 
-	This mutates and saves the quotation in-place, reusing core helpers.
+	Creates a minimal Address for Customer parties when none exist.
+	Returns list of address docs (possibly newly created).
 	"""
-	if not quotation or not settings:
-		return
+	address_docs = core_cart.get_address_docs(party=party)
+	if address_docs:
+		return address_docs
 
-	def _ensure_minimal_address(party):
-		"""Ensure at least one Address exists and is linked to the party.
+	# Only auto-create for Customer (portal user flow)
+	if not party or getattr(party, "doctype", None) != "Customer":
+		return address_docs
 
-		Creates a minimal Address for Customer parties when none exist.
-		Returns list of address docs (possibly newly created).
-		"""
-		address_docs = core_cart.get_address_docs(party=party)
-		if address_docs:
-			return address_docs
+	# Conservative defaults: these satisfy mandatory address fields on most ERPNext setups.
+	# If your Address doctype has stricter mandatory fields, adjust here.
+	country = frappe.get_system_settings("country") or "India"
+	address_title = (getattr(party, "customer_name", None) or getattr(party, "name", None) or "Customer")
+
+	addr = frappe.get_doc(
+		{
+			"doctype": "Address",
+			"address_title": address_title,
+			"address_type": "Shipping",
+			"address_line1": "Default Address",
+			"city": "Default",
+			"country": country,
+			"links": [
+				{
+					"link_doctype": "Customer",
+					"link_name": party.name,
+				}
+			],
+		}
+	)
+	addr.flags.ignore_permissions = True
+	addr.insert(ignore_permissions=True)
 
-		# Only auto-create for Customer (portal user flow)
-		if not party or getattr(party, "doctype", None) != "Customer":
-			return address_docs
+	return core_cart.get_address_docs(party=party)
 
-		# Conservative defaults: these satisfy mandatory address fields on most ERPNext setups.
-		# If your Address doctype has stricter mandatory fields, adjust here.
-		country = frappe.db.get_single_value("System Settings", "country") or "India"
-		address_title = (getattr(party, "customer_name", None) or getattr(party, "name", None) or "Customer")
 
-		addr = frappe.get_doc(
-			{
-				"doctype": "Address",
-				"address_title": address_title,
-				"address_type": "Shipping",
-				"address_line1": "Default Address",
-				"city": "Default",
-				"country": country,
-				"links": [
-					{
-						"link_doctype": "Customer",
-						"link_name": party.name,
-					}
-				],
-			}
+def _apply_default_address(quotation, settings) -> bool:
+	"""Fill in a default address when shipping has been explicitly disabled.
+
+	Returns True when the quotation was changed.
+	"""
+	if quotation.shipping_address_name or quotation.customer_address:
+		return False
+	if not _is_shipping_section_disabled(settings):
+		return False
+
+	party = core_cart.get_party()
+	address_docs = _ensure_minimal_address(party)
+
+	default_type = getattr(settings, "default_shipping_address_type", None)
+	chosen_doc = None
+
+	if default_type in ("Shipping", "Billing"):
+		chosen_doc = next(
+			(a for a in address_docs if getattr(a, "address_type", None) == default_type),
+			None,
 		)
-		addr.flags.ignore_permissions = True
-		addr.insert(ignore_permissions=True)
-		frappe.db.commit()
 
-		return core_cart.get_address_docs(party=party)
+	# Fallback: first address returned by core ordering.
+	if not chosen_doc and address_docs:
+		chosen_doc = address_docs[0]
 
-	# 1) Ensure a default address only when shipping has been explicitly disabled.
-	if _is_shipping_section_disabled(settings) and not (
-		getattr(quotation, "shipping_address_name", None) or getattr(quotation, "customer_address", None)
-	):
-		party = core_cart.get_party()
-		address_docs = _ensure_minimal_address(party)
-
-		default_type = getattr(settings, "default_shipping_address_type", None)
-		chosen_doc = None
-
-		if default_type in ("Shipping", "Billing"):
-			chosen_doc = next(
-				(a for a in address_docs if getattr(a, "address_type", None) == default_type),
-				None,
-			)
-
-		# Fallback: first address returned by core ordering.
-		if not chosen_doc and address_docs:
-			chosen_doc = address_docs[0]
-
-		if chosen_doc and getattr(chosen_doc, "name", None):
-			quotation.shipping_address_name = chosen_doc.name
-			quotation.customer_address = chosen_doc.name
-			quotation.flags.ignore_permissions = True
-			quotation.save()
-
-			# Re-apply cart settings to update taxes/totals/shipping rules based on address
-			core_cart.apply_cart_settings(quotation=quotation)
-			quotation.flags.ignore_permissions = True
-			quotation.save()
-
-	# 2) Ensure default payment terms only when payment has been explicitly disabled.
-	payment_mode = get_payment_mode_for_doc(quotation)
+	if not (chosen_doc and getattr(chosen_doc, "name", None)):
+		return False
+
+	quotation.shipping_address_name = chosen_doc.name
+	quotation.customer_address = chosen_doc.name
+
+	# Re-apply cart settings to update taxes/totals/shipping rules based on address;
+	# this works on the in-memory doc, the caller's single save persists it.
+	core_cart.apply_cart_settings(quotation=quotation)
+	return True
+
+
+def _apply_default_payment_terms(quotation, settings) -> bool:
+	"""Fill in default payment terms when payment has been explicitly disabled.
+
+	Returns True when the quotation was changed.
+	"""
+	default_terms = getattr(settings, "default_payment_term_template", None)
 	if (
-		payment_mode != PAYMENT_MODE_COD
-		and _is_payment_section_disabled(settings)
-		and getattr(settings, "default_payment_term_template", None)
-		and not getattr(quotation, "payment_terms_template", None)
+		quotation.payment_terms_template
+		or not default_terms
+		or not _is_payment_section_disabled(settings)
+		or get_payment_mode_for_doc(quotation) == PAYMENT_MODE_COD
 	):
-		quotation.payment_terms_template = settings.default_payment_term_template
+		return False
+
+	quotation.payment_terms_template = default_terms
+	return True
+
+
+def _ensure_defaults_on_quotation(quotation, settings):
+	"""Ensure address and payment defaults are set on the given cart quotation.
+
+	This mutates the quotation in-place, reusing core helpers, and saves it
+	once at the end only when something was actually changed. Once a cart
+	has its defaults this is a handful of attribute reads and no writes.
+	"""
+	if not quotation or not settings:
+		return
+
+	dirty = _apply_default_address(quotation, settings)
+	dirty |= _apply_default_payment_terms(quotation, settings)
+
+	if dirty:
 		quotation.flags.ignore_permissions = True
 		quotation.save()
 
@@ -429,18 +476,45 @@ def get_cart_quotation(doc=None):
 
 	# When enabled, ensure defaults and then delegate to core.
 	# Our decorate_quotation_doc override will adjust images.
+	# _get_checkout_quotation already applies the defaults to a fetched cart.
 	if not doc:
 		quotation = _get_checkout_quotation(settings)
 		core_cart.set_cart_count(quotation)
 	else:
 		quotation = doc
-
-	_ensure_defaults_on_quotation(quotation, settings)
+		_ensure_defaults_on_quotation(quotation, settings)
 
 	# Let core return the context; our decorate_quotation_doc override will run automatically
 	return core_cart.get_cart_quotation(quotation)
 
 
+def _get_static_checkout_flags(settings) -> tuple:
+	"""Return the flags that depend only on the settings doc.
+
+	Memoized per site and keyed on the doc's `modified` stamp, so a settings
+	save is picked up by every worker on its next call without any hook.
+	"""
+	modified = getattr(settings, "modified", None)
+	site = getattr(frappe.local, "site", None)
+	cached = _FLAGS_CACHE.get(site) if modified else None
+	if cached and cached[0] == modified:
+		return cached[1]
+
+	shipping_hidden = _is_shipping_section_disabled(settings)
+	payment_hidden = _is_payment_section_disabled(settings)
+	enabled_modes = tuple(_get_enabled_payment_modes(settings))
+	flags = (
+		shipping_hidden,
+		payment_hidden,
+		shipping_hidden or payment_hidden,
+		enabled_modes,
+		_get_default_payment_mode(settings, enabled_modes),
+	)
+	if modified:
+		_FLAGS_CACHE[site] = (modified, flags)
+	return flags
+
+
 @frappe.whitelist(allow_guest=True)
 def get_simple_checkout_flags():
 	"""Expose webshop checkout visibility flags for frontend JS.
@@ -448,11 +522,13 @@ def get_simple_checkout_flags():
 	If settings are missing, this returns all False so UI behaves as core.
 	"""
 	settings = _get_settings()
-	shipping_hidden = _is_shipping_section_disabled(settings)
-	payment_hidden = _is_payment_section_disabled(settings)
-	checkout_overrides_active = shipping_hidden or payment_hidden
-	enabled_modes = _get_enabled_payment_modes(settings)
-	default_mode = _get_default_payment_mode(settings, enabled_modes)
+	(
+		shipping_hidden,
+		payment_hidden,
+		checkout_overrides_active,
+		enabled_modes,
+		default_mode,
+	) = _get_static_checkout_flags(settings)
 	selected_mode = default_mode
 
 	try:
@@ -518,9 +594,9 @@ def place_order(payment_mode: str | None = None):
 	if not _requires_checkout_overrides(settings):
 		order_name = core_cart.place_order()
 	else:
-		quotation = _get_checkout_quotation(settings)
+		# The quotation above already carries the checkout defaults and the
+		# persisted payment mode, so validate it rather than loading the cart again.
 		_validate_checkout_readiness(quotation)
-		quotation.company = quotation.company or frappe.db.get_single_value("Webshop Settings", "company")
 
 		order_name = core_cart.place_order()
 
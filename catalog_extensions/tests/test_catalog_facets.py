@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import frappe
+
+from catalog_extensions import api
+
+
+class CatalogFacetsTestCase(TestCase):
+    def test_group_and_brand_facets_are_folded_from_one_query(self):
+        rows = [
+            frappe._dict(item_group_name="Shoes", brand="Acme", count=3),
+            frappe._dict(item_group_name="Shoes", brand=None, count=2),
+            frappe._dict(item_group_name="Bags", brand="Acme", count=1),
+            frappe._dict(item_group_name=None, brand="Zeta", count=4),
+        ]
+        fake_db = SimpleNamespace(sql=lambda *args, **kwargs: rows)
+
+        with patch("catalog_extensions.api.frappe.db", fake_db):
+            item_groups, brands = api._get_item_group_and_brand_facets("wi.published = 1", {})
+
+        self.assertEqual(
+            [(row.item_group_name, row.count) for row in item_groups],
+            [("Shoes", 5), ("Bags", 1)],
+        )
+        self.assertEqual([(row.brand, row.count) for row in brands], [("Acme", 4), ("Zeta", 4)])
+
+
+class FilterFacetsGenerationTestCase(TestCase):
+    def test_clearing_bumps_the_generation_in_the_cache_key(self):
+        store = {}
+        fake_cache = SimpleNamespace(
+            make_key=lambda key: f"site|{key}",
+            get=store.get,
+            incr=lambda key: store.__setitem__(key, store.get(key, 0) + 1),
+        )
+        brand_context = frappe._dict(allowed_brands=[])
+
+        with (
+            patch("catalog_extensions.api.frappe.cache", return_value=fake_cache),
+            patch("catalog_extensions.api._get_selling_price_list", return_value="Standard Selling"),
+        ):
+            before = api._get_filter_facets_cache_key("Shoes", {}, brand_context, 1, 1)
+            api.clear_filter_facets_cache()
+            after = api._get_filter_facets_cache_key("Shoes", {}, brand_context, 1, 1)
+
+        self.assertTrue(before.startswith(f"{api.FACETS_CACHE_KEY}:0:"))
+        self.assertTrue(after.startswith(f"{api.FACETS_CACHE_KEY}:1:"))
+
+
+class FacetBrandContextTestCase(TestCase):
+    def test_restricted_context_scopes_non_brand_facets_when_session_is_unrestricted(self):
+        session_context = frappe._dict(customer_group=None, allowed_brands=[], restricted=False)
+        warmed_context = frappe._dict(customer_group="Retail", allowed_brands=["Acme"], restricted=True)
+        captured = {}
+
+        def fake_group_and_brand_facets(where, params):
+            captured["brands"] = params
+            return [], []
+
+        def fake_price_facets(where, params):
+            captured["price"] = params
+            return [], {}
+
+        def fake_sql(query, params=None, **kwargs):
+            captured.setdefault("offers_and_badges", []).append(params)
+            return []
+
+        with (
+            patch("catalog_extensions.api.get_brand_filter_context", return_value=session_context),
+            patch("catalog_extensions.brand_filtering.get_brand_filter_context", return_value=session_context),
+            patch("catalog_extensions.api._get_item_group_and_brand_facets", side_effect=fake_group_and_brand_facets),
+            patch("catalog_extensions.api._get_price_facets", side_effect=fake_price_facets),
+            patch("catalog_extensions.api.frappe.db", SimpleNamespace(sql=fake_sql)),
+        ):
+            api._compute_filter_facets(frappe._dict(), warmed_context, 1, 1)
+
+        self.assertEqual(captured["brands"]["allowed_brands"], ("Acme",))
+        self.assertEqual(captured["price"]["brand_filters"], ("Acme",))
+        self.assertEqual(len(captured["offers_and_badges"]), 2)
+        for params in captured["offers_and_badges"]:
+            self.assertEqual(params["brand_filters"], ("Acme",))
+
+
+class BaseFacetRequestTestCase(TestCase):
+    def test_pagination_and_sort_keys_do_not_count_as_filters(self):
+        self.assertTrue(
+            api._is_base_facet_request({"item_group": "Shoes", "start": 20, "page_length": 20, "order_by": "name"})
+        )
+        self.assertFalse(api._is_base_facet_request({"item_group": "Shoes", "search": "boot"}))
+        self.assertFalse(api._is_base_facet_request({"field_filters": {"brand": ["Acme"]}}))
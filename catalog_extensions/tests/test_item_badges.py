@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from catalog_extensions import api
+
+
+def _sql_params(fake_sql):
+    return [call.args[1] for call in fake_sql.call_args_list if len(call.args) > 1]
+
+
+class ReplaceAutoBadgesTestCase(TestCase):
+    # Fixture rows are served in call order: current Auto badge counts, then
+    # (for the DELETE) nothing, then each Item's highest existing idx.
+    def _fake_db(self, current_rows):
+        return SimpleNamespace(
+            sql=MagicMock(side_effect=[current_rows, [], [("ITEM-1", 2)]]),
+            bulk_insert=MagicMock(),
+        )
+
+    def test_unchanged_badges_skip_all_writes(self):
+        fake_db = self._fake_db([("ITEM-1", "New", 1), ("ITEM-1", "On Sale", 1)])
+
+        with (
+            patch("catalog_extensions.api.frappe.db", fake_db),
+            patch("catalog_extensions.api.rebuild_filterable_badges") as rebuild,
+            patch("catalog_extensions.api.clear_filter_facets_cache"),
+        ):
+            api._replace_auto_badges(["ITEM-1"], [("ITEM-1", "New"), ("ITEM-1", "On Sale")])
+
+        self.assertEqual(_sql_params(fake_db.sql), [{"items": ("ITEM-1",)}])
+        fake_db.bulk_insert.assert_not_called()
+        rebuild.assert_not_called()
+
+    def test_only_changed_badges_are_written(self):
+        fake_db = self._fake_db([("ITEM-1", "New", 1), ("ITEM-1", "Low Stock", 1)])
+
+        with (
+            patch("catalog_extensions.api.frappe.db", fake_db),
+            patch("catalog_extensions.api._generate_row_names", return_value=iter(["hash"])),
+            patch("catalog_extensions.api.rebuild_filterable_badges") as rebuild,
+            patch("catalog_extensions.api.clear_filter_facets_cache"),
+        ):
+            api._replace_auto_badges(["ITEM-1"], [("ITEM-1", "New"), ("ITEM-1", "Bestseller")])
+
+        self.assertIn({"pairs": (("ITEM-1", "Low Stock"),)}, _sql_params(fake_db.sql))
+        values = fake_db.bulk_insert.call_args.kwargs["values"]
+        self.assertEqual(values, [("hash", "ITEM-1", "Item", "badges", "Bestseller", "Auto", 3)])
+        rebuild.assert_called_once()
+
+
+class GenerateRowNamesTestCase(TestCase):
+    def test_names_are_distinct_ten_char_hex(self):
+        names = list(api._generate_row_names(50))
+
+        self.assertEqual(len(names), 50)
+        self.assertEqual(len(set(names)), 50)
+        for name in names:
+            self.assertEqual(len(name), 10)
+            int(name, 16)
+
+
+class ReplaceFilterableBadgesTestCase(TestCase):
+    def test_matching_badges_skip_delete_and_insert(self):
+        fake_db = SimpleNamespace(
+            sql=MagicMock(return_value=[("WI-1", "New"), ("WI-1", "On Sale")]),
+            bulk_insert=MagicMock(),
+        )
+
+        with patch("catalog_extensions.api.frappe.db", fake_db):
+            api._replace_filterable_badges(["WI-1"], ["New", "On Sale"])
+
+        self.assertEqual(fake_db.sql.call_count, 1)
+        fake_db.bulk_insert.assert_not_called()
+
+    def test_changed_badges_are_rewritten(self):
+        fake_db = SimpleNamespace(sql=MagicMock(return_value=[("WI-1", "New")]), bulk_insert=MagicMock())
+
+        with patch("catalog_extensions.api.frappe.db", fake_db):
+            api._replace_filterable_badges(["WI-1"], ["New", "On Sale"])
+
+        self.assertEqual(fake_db.sql.call_count, 2)
+        self.assertEqual(
+            [row[1:6] for row in fake_db.bulk_insert.call_args.kwargs["values"]],
+            [
+                ("WI-1", "filterable_badges", "Website Item", "New", 1),
+                ("WI-1", "filterable_badges", "Website Item", "On Sale", 2),
+            ],
+        )
+
+
+class GetItemBadgesTestCase(TestCase):
+    def test_only_published_items_get_keys(self):
+        # ITEM-1 is published with one badge, ITEM-2 is published without
+        # badges, ITEM-3 has no published Website Item.
+        fake_db = SimpleNamespace(
+            sql=MagicMock(
+                return_value=[
+                    ("ITEM-1", "New", "Auto", None, None),
+                    ("ITEM-2", None, None, None, None),
+                ]
+            )
+        )
+
+        with (
+            patch("catalog_extensions.api.frappe.db", fake_db),
+            patch("catalog_extensions.api._get_conf_bool", return_value=1),
+        ):
+            badges = api.get_item_badges(["ITEM-1", "ITEM-2", "ITEM-3"])
+
+        self.assertEqual(
+            badges,
+            {
+                "ITEM-1": [{"badge_type": "New", "source": "Auto", "valid_from": None, "valid_upto": None}],
+                "ITEM-2": [],
+            },
+        )
+
+    def test_no_published_items_returns_empty_mapping(self):
+        fake_db = SimpleNamespace(sql=MagicMock(return_value=[]))
+
+        with (
+            patch("catalog_extensions.api.frappe.db", fake_db),
+            patch("catalog_extensions.api._get_conf_bool", return_value=1),
+        ):
+            self.assertEqual(api.get_item_badges(["ITEM-3"]), {})
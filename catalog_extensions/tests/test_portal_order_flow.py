@@ -1126,6 +1126,46 @@ class CheckoutSettingsSemanticsTestCase(TestCase):
         self.assertIsNone(quotation.payment_terms_template)
         apply_cart_settings.assert_called_once_with(quotation=quotation)
 
+    def test_apply_defaults_saves_quotation_once_when_both_sections_are_disabled(self):
+        quotation = DummyQuotation(
+            shipping_address_name=None,
+            customer_address=None,
+            payment_terms_template=None,
+        )
+        party = SimpleNamespace(doctype="Customer", name="CUST-0001", customer_name="Test Customer")
+        shipping_address = SimpleNamespace(name="ADDR-SHIP", address_type="Shipping")
+        settings = SimpleNamespace(
+            hide_shipping_on_webshop=1,
+            hide_payment_on_webshop=1,
+            default_payment_term_template="NET-30",
+            default_shipping_address_type="Shipping",
+        )
+
+        with (
+            patch("catalog_extensions.simple_checkout.core_cart.get_party", return_value=party),
+            patch("catalog_extensions.simple_checkout.core_cart.get_address_docs", return_value=[shipping_address]),
+            patch("catalog_extensions.simple_checkout.core_cart.apply_cart_settings"),
+            patch.object(quotation, "save", wraps=quotation.save) as save,
+        ):
+            simple_checkout._ensure_defaults_on_quotation(quotation, settings)
+
+        self.assertEqual(quotation.shipping_address_name, "ADDR-SHIP")
+        self.assertEqual(quotation.payment_terms_template, "NET-30")
+        save.assert_called_once_with()
+
+    def test_apply_defaults_skips_save_when_nothing_changes(self):
+        quotation = DummyQuotation(payment_terms_template="NET-30")
+        settings = SimpleNamespace(
+            hide_shipping_on_webshop=1,
+            hide_payment_on_webshop=1,
+            default_payment_term_template="NET-30",
+            default_shipping_address_type="Shipping",
+        )
+
+        simple_checkout._ensure_defaults_on_quotation(quotation, settings)
+
+        self.assertFalse(quotation.saved)
+
     def test_frontend_flags_include_cancel_toggle(self):
         settings = SimpleNamespace(
             enable_prepaid=1,
@@ -4,11 +4,28 @@ Catalog Extensions - Image Zoom Configuration
 Utilities for managing zoom mode settings per site
 """
 
+import json
+import os
+import tempfile
+
 import frappe
 
 ZOOM_MODE_CLICK = "click"
 ZOOM_MODE_HOVER = "hover"
 ZOOM_SETTING_KEY = "catalog_image_zoom_mode"
+_VALID_MODES = frozenset((ZOOM_MODE_CLICK, ZOOM_MODE_HOVER))
+
+# Built once; get_zoom_assets returns these as-is and callers must not mutate them.
+_HOVER_ASSETS = {
+    "mode": ZOOM_MODE_HOVER,
+    "js": "/assets/catalog_extensions/js/image_zoom_hover.js",
+    "css": "/assets/catalog_extensions/css/image_zoom_hover.css"
+}
+_CLICK_ASSETS = {
+    "mode": ZOOM_MODE_CLICK,
+    "js": "/assets/catalog_extensions/js/image_zoom.js",
+    "css": "/assets/catalog_extensions/css/image_zoom.css"
+}
 
 
 def get_zoom_mode():
@@ -16,11 +33,15 @@ def get_zoom_mode():
     Get the configured zoom mode for the current site.
     Returns: 'click' or 'hover'
     Default is 'hover' for better UX
+
+    frappe.conf is already loaded once per request, so this is a single dict
+    lookup; it is deliberately not memoized per process, since other workers
+    would keep serving the old mode after set_zoom_mode rewrites the file.
     """
     try:
         # Check site config first
         site_config = frappe.conf.get(ZOOM_SETTING_KEY)
-        if site_config in [ZOOM_MODE_CLICK, ZOOM_MODE_HOVER]:
+        if site_config in _VALID_MODES:
             return site_config
 
         # Default to hover mode
@@ -34,7 +55,7 @@ def set_zoom_mode(mode):
     Set the zoom mode for the current site.
     mode: 'click' or 'hover'
     """
-    if mode not in [ZOOM_MODE_CLICK, ZOOM_MODE_HOVER]:
+    if mode not in _VALID_MODES:
         raise ValueError(f"Invalid zoom mode: {mode}. Must be 'click' or 'hover'")
 
     # Update site_config.json
@@ -43,16 +64,24 @@ def set_zoom_mode(mode):
 
     try:
         with open(site_config_path, 'r') as f:
-            import json
             config = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         config = {}
 
     config[ZOOM_SETTING_KEY] = mode
 
-    with open(site_config_path, 'w') as f:
-        import json
-        json.dump(config, f, indent=2)
+    # Write to a temp file in the same directory and swap it in, so a crash
+    # mid-write never leaves a truncated site_config.json behind.
+    fd, tmp_path = tempfile.mkstemp(dir=site_path, prefix=".site_config.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(config, f, indent=2)
+        if os.path.exists(site_config_path):
+            os.chmod(tmp_path, os.stat(site_config_path).st_mode & 0o777)
+        os.replace(tmp_path, site_config_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
     return f"Zoom mode set to: {mode}"
 
@@ -63,17 +92,4 @@ def get_zoom_assets():
     API endpoint to get the correct zoom assets based on site configuration.
     Returns dict with js and css paths.
     """
-    mode = get_zoom_mode()
-
-    if mode == ZOOM_MODE_HOVER:
-        return {
-            "mode": mode,
-            "js": "/assets/catalog_extensions/js/image_zoom_hover.js",
-            "css": "/assets/catalog_extensions/css/image_zoom_hover.css"
-        }
-    else:
-        return {
-            "mode": mode,
-            "js": "/assets/catalog_extensions/js/image_zoom.js",
-            "css": "/assets/catalog_extensions/css/image_zoom.css"
-        }
+    return _HOVER_ASSETS if get_zoom_mode() == ZOOM_MODE_HOVER else _CLICK_ASSETS
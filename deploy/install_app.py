@@ -15,17 +15,20 @@ REQUIRED_APPS = ("erpnext", "payments", "webshop")
 OPTIONAL_APPS = ("erpnext_shipping_extended",)
 
 
-def run_bench_command(command, cwd=None, site=None):
-    """Execute a bench command safely."""
+def run_bench_command(args, cwd=None, site=None):
+    """Execute a bench command safely.
+
+    `args` is the argument list after `bench [--site SITE]`; it is passed
+    straight to execve, so no shell is spawned and nothing needs quoting.
+    """
+    full_command = ["bench"]
     if site:
-        full_command = f"bench --site {site} {command}"
-    else:
-        full_command = f"bench {command}"
+        full_command += ["--site", site]
+    full_command += args
     
     try:
         result = subprocess.run(
             full_command,
-            shell=True,
             cwd=cwd,
             capture_output=True,
             text=True,
@@ -38,14 +41,10 @@ def run_bench_command(command, cwd=None, site=None):
         return False, "", str(e)
 
 
-def get_python_path(bench_path):
-    env_python = Path(bench_path) / "env" / "bin" / "python"
-    return str(env_python) if env_python.exists() else sys.executable
-
-
 def get_site_apps(site, bench_path):
+    """Return (installed app names, error) from a single `list-apps` call."""
     success, stdout, stderr = run_bench_command(
-        "list-apps --format json",
+        ["list-apps", "--format", "json"],
         cwd=bench_path,
         site=site,
     )
@@ -57,6 +56,11 @@ def get_site_apps(site, bench_path):
     except Exception:
         parsed = [line.strip() for line in stdout.splitlines() if line.strip()]
 
+    # Newer Frappe prints {"<site>": [<app>, ...]}; older builds print a flat
+    # list of names or of {"name": ...} rows.
+    if isinstance(parsed, dict):
+        parsed = parsed.get(site) or [app for rows in parsed.values() for app in rows]
+
     apps = []
     for row in parsed:
         if isinstance(row, dict):
@@ -69,11 +73,15 @@ def get_site_apps(site, bench_path):
 
 
 def check_site_dependencies(site, bench_path):
+    """Check required apps; return the installed app list, or None on failure.
+
+    The list is reused by install_app so `list-apps` only runs once.
+    """
     print(f"[STEP] Checking required site dependencies for {site}...")
     apps, error = get_site_apps(site, bench_path)
     if apps is None:
         print(f"[ERROR] Could not read installed apps for {site}: {error}")
-        return False
+        return None
 
     missing_required = [app for app in REQUIRED_APPS if app not in apps]
     if missing_required:
@@ -81,7 +89,7 @@ def check_site_dependencies(site, bench_path):
             "[ERROR] Missing required apps on site "
             f"{site}: {', '.join(missing_required)}. Install them before catalog_extensions."
         )
-        return False
+        return None
 
     missing_optional = [app for app in OPTIONAL_APPS if app not in apps]
     for app in missing_optional:
@@ -91,32 +99,13 @@ def check_site_dependencies(site, bench_path):
         )
 
     print("[SUCCESS] Site dependency check passed")
-    return True
-
-
-def run_setup_script(script_name, site, bench_path):
-    python_path = get_python_path(bench_path)
-    script_path = Path(bench_path) / "apps" / "catalog_extensions" / "deploy" / script_name
-    result = subprocess.run(
-        [python_path, str(script_path), "--site", site],
-        cwd=bench_path,
-        capture_output=True,
-        text=True,
-        timeout=300,
-    )
-    if result.returncode == 0:
-        print(result.stdout.strip())
-        return True
-
-    print(result.stdout.strip())
-    print(f"[ERROR] {script_name} failed: {result.stderr}")
-    return False
+    return apps
 
 
 def verify_setup(site, bench_path):
     print(f"[STEP] Verifying setup artifacts on {site}...")
     success, stdout, stderr = run_bench_command(
-        "execute catalog_extensions.install_support.assert_setup_complete",
+        ["execute", "catalog_extensions.install_support.assert_setup_complete"],
         cwd=bench_path,
         site=site,
     )
@@ -131,34 +120,18 @@ def verify_setup(site, bench_path):
     return False
 
 
-def check_app_installed(site, bench_path, app_name):
-    """Check if app is already installed on site."""
-    success, stdout, stderr = run_bench_command(
-        f"list-apps --format json",
-        cwd=bench_path,
-        site=site
-    )
-    if success:
-        try:
-            apps = json.loads(stdout)
-            return app_name in [a.get('name') for a in apps]
-        except:
-            return app_name in stdout
-    return False
-
-
-def install_app(site, bench_path, app_name="catalog_extensions"):
+def install_app(site, bench_path, installed_apps, app_name="catalog_extensions"):
     """Install the catalog_extensions app on the site."""
     print(f"[STEP] Installing {app_name} on site {site}...")
     
     # Check if already installed
-    if check_app_installed(site, bench_path, app_name):
+    if app_name in installed_apps:
         print(f"[INFO] {app_name} is already installed on {site}")
         return True
     
     # Install the app
     success, stdout, stderr = run_bench_command(
-        f"install-app {app_name}",
+        ["install-app", app_name],
         cwd=bench_path,
         site=site
     )
@@ -172,11 +145,16 @@ def install_app(site, bench_path, app_name="catalog_extensions"):
 
 
 def migrate_site(site, bench_path):
-    """Run migration to create DocTypes."""
+    """Run migration to create DocTypes.
+
+    The app's after_migrate hook runs the same DocType, custom field and
+    index setup as deploy/setup_doctypes.py and setup_custom_fields.py, so
+    those scripts are not spawned separately here.
+    """
     print(f"[STEP] Running migration for {site}...")
     
     success, stdout, stderr = run_bench_command(
-        "migrate",
+        ["migrate"],
         cwd=bench_path,
         site=site
     )
@@ -194,7 +172,7 @@ def clear_cache(site, bench_path):
     print(f"[STEP] Clearing cache...")
     
     success, stdout, stderr = run_bench_command(
-        "clear-cache",
+        ["clear-cache"],
         cwd=bench_path,
         site=site
     )
@@ -212,7 +190,7 @@ def restart_bench(bench_path):
     print(f"[STEP] Restarting bench...")
     
     success, stdout, stderr = run_bench_command(
-        "restart",
+        ["restart"],
         cwd=bench_path
     )
     
@@ -259,23 +237,18 @@ def main():
         print(f"[ERROR] Invalid bench path: {args.bench_path}")
         sys.exit(1)
 
-    if not check_site_dependencies(args.site, str(bench_path)):
+    installed_apps = check_site_dependencies(args.site, str(bench_path))
+    if installed_apps is None:
         sys.exit(1)
     
     # Step 1: Install app
-    if not install_app(args.site, str(bench_path)):
+    if not install_app(args.site, str(bench_path), installed_apps):
         sys.exit(1)
     
-    # Step 2: Migrate to create DocTypes
+    # Step 2: Migrate to create DocTypes (after_migrate also runs field/index setup)
     if not migrate_site(args.site, str(bench_path)):
         sys.exit(1)
 
-    if not run_setup_script("setup_doctypes.py", args.site, str(bench_path)):
-        sys.exit(1)
-
-    if not run_setup_script("setup_custom_fields.py", args.site, str(bench_path)):
-        sys.exit(1)
-
     if not verify_setup(args.site, str(bench_path)):
         sys.exit(1)
     
@@ -32,67 +32,89 @@ def get_frappe_connection(site: str):
         return None
 
 
-def create_custom_field(frappe, doctype: str, field_config: dict) -> bool:
-    """Create a single custom field if it doesn't exist."""
-
-    fieldname = field_config.get("fieldname")
-    existing = frappe.db.exists("Custom Field", {"dt": doctype, "fieldname": fieldname})
-    if existing:
-        field_doc = frappe.get_doc("Custom Field", existing)
-        fields_changed = False
-        for key in (
-            "label",
-            "fieldtype",
-            "options",
-            "insert_after",
-            "reqd",
-            "default",
-            "description",
-            "depends_on",
-            "read_only",
-            "hidden",
-            "print_hide",
-        ):
-            target_value = field_config.get(key, "" if key in ("options", "default", "description", "depends_on") else 0)
-            if getattr(field_doc, key, None) != target_value:
-                setattr(field_doc, key, target_value)
-                fields_changed = True
-
-        if fields_changed:
-            field_doc.save(ignore_permissions=True)
-            frappe.db.commit()
-            print(f"[SUCCESS] Updated field '{doctype}.{fieldname}'")
-        else:
-            print(f"[INFO] Field '{doctype}.{fieldname}' already exists")
-        return True
+CUSTOM_FIELD_KEYS = (
+    "label",
+    "fieldtype",
+    "options",
+    "insert_after",
+    "reqd",
+    "default",
+    "description",
+    "depends_on",
+    "read_only",
+    "hidden",
+    "print_hide",
+)
+CUSTOM_FIELD_DEFAULTS = {
+    "options": "",
+    "insert_after": "last",
+    "reqd": 0,
+    "default": "",
+    "description": "",
+    "depends_on": "",
+    "read_only": 0,
+    "hidden": 0,
+    "print_hide": 0,
+}
+# New fields are created hidden from print; existing fields keep being compared
+# against print_hide=0, as the per-field setup always did.
+CUSTOM_FIELD_CREATE_DEFAULTS = {**CUSTOM_FIELD_DEFAULTS, "print_hide": 1}
+
+
+def _normalize(value) -> str:
+    return "" if value is None else str(value)
+
+
+def create_custom_fields(frappe, fields_by_doctype: dict) -> bool:
+    """Create or update custom fields for several DocTypes in one batch.
+
+    Existing definitions are read with a single query; only missing or
+    changed fields are handed to Frappe's `create_custom_fields`.
+    """
+
+    from frappe.custom.doctype.custom_field.custom_field import (
+        create_custom_fields as frappe_create_custom_fields,
+    )
 
     try:
-        field_doc = frappe.get_doc(
-            {
-                "doctype": "Custom Field",
-                "dt": doctype,
-                "fieldname": fieldname,
-                "label": field_config.get("label"),
-                "fieldtype": field_config.get("fieldtype"),
-                "options": field_config.get("options", ""),
-                "insert_after": field_config.get("insert_after", "last"),
-                "reqd": field_config.get("reqd", 0),
-                "default": field_config.get("default", ""),
-                "description": field_config.get("description", ""),
-                "depends_on": field_config.get("depends_on", ""),
-                "read_only": field_config.get("read_only", 0),
-                "hidden": field_config.get("hidden", 0),
-                "print_hide": field_config.get("print_hide", 1),
-            }
-        )
+        # Backquote the keys: `default` is a reserved word in MariaDB.
+        existing = {
+            (row.dt, row.fieldname): row
+            for row in frappe.get_all(
+                "Custom Field",
+                filters={"dt": ["in", list(fields_by_doctype)]},
+                fields=["dt", "fieldname", *(f"`{key}`" for key in CUSTOM_FIELD_KEYS)],
+            )
+        }
+    except Exception as e:
+        print(f"[ERROR] Failed to read custom fields on {', '.join(fields_by_doctype)}: {e}")
+        return False
 
-        field_doc.insert(ignore_permissions=True)
-        frappe.db.commit()
+    pending = {}
+    for doctype, fields in fields_by_doctype.items():
+        for field_config in fields:
+            current = existing.get((doctype, field_config["fieldname"]))
+            defaults = CUSTOM_FIELD_DEFAULTS if current is not None else CUSTOM_FIELD_CREATE_DEFAULTS
+            df = {key: field_config.get(key, defaults.get(key)) for key in CUSTOM_FIELD_KEYS}
+            df["fieldname"] = field_config["fieldname"]
+
+            if current is None:
+                print(f"[SUCCESS] Creating field '{doctype}.{df['fieldname']}'")
+            elif any(_normalize(current.get(key)) != _normalize(df[key]) for key in CUSTOM_FIELD_KEYS):
+                print(f"[SUCCESS] Updating field '{doctype}.{df['fieldname']}'")
+            else:
+                print(f"[INFO] Field '{doctype}.{df['fieldname']}' already exists")
+                continue
+            pending.setdefault(doctype, []).append(df)
 
-        print(f"[SUCCESS] Created field '{doctype}.{fieldname}'")
+    if not pending:
+        return True
+
+    try:
+        frappe_create_custom_fields(pending, ignore_validate=True, update=True)
         return True
     except Exception as e:
-        print(f"[ERROR] Failed to create field '{doctype}.{fieldname}': {e}")
+        print(f"[ERROR] Failed to create fields on {', '.join(pending)}: {e}")
         return False
 
 
@@ -169,11 +191,7 @@ def setup_item_fields(frappe) -> bool:
         },
     ]
 
-    ok = True
-    for field in fields:
-        if not create_custom_field(frappe, "Item", field):
-            ok = False
-    return ok
+    return create_custom_fields(frappe, {"Item": fields})
 
 
 def setup_website_item_fields(frappe) -> bool:
@@ -220,11 +238,7 @@ def setup_website_item_fields(frappe) -> bool:
         },
     ]
 
-    ok = True
-    for field in fields:
-        if not create_custom_field(frappe, "Website Item", field):
-            ok = False
-    return ok
+    return create_custom_fields(frappe, {"Website Item": fields})
 
 
 def setup_checkout_mode_fields(frappe) -> bool:
@@ -283,12 +297,7 @@ def setup_checkout_mode_fields(frappe) -> bool:
         ],
     }
 
-    ok = True
-    for doctype, fields in fields_by_doctype.items():
-        for field in fields:
-            if not create_custom_field(frappe, doctype, field):
-                ok = False
-    return ok
+    return create_custom_fields(frappe, fields_by_doctype)
 
 
 def sync_item_badge_doctype(frappe) -> bool:
@@ -331,46 +340,54 @@ def setup_performance_indexes(frappe) -> bool:
         {
             "table": "Website Offer",
             "name": "idx_website_offer_filter",
-            "columns": "parent, offer_title",
+            "columns": ["parent", "offer_title"],
             "comment": "Index for offer filter queries"
         },
         {
             "table": "Item Badge",
             "name": "idx_item_badge_filter",
-            "columns": "parent, badge_type",
+            "columns": ["parent", "badge_type"],
             "comment": "Index for badge filter queries"
         },
+        {
+            "table": "Item Badge",
+            "name": "idx_item_badge_parent",
+            "columns": ["parent", "parenttype", "parentfield", "badge_type"],
+            "comment": "Covering index for per-doctype badge child-table lookups"
+        },
         {
             "table": "Item Price",
             "name": "idx_item_price_filter",
-            "columns": "item_code, price_list, selling, price_list_rate",
-            "comment": "Index for price range filter queries"
+            "columns": ["item_code", "price_list", "selling", "price_list_rate"],
+            "comment": "item_code-led: per-item price lookups and the price EXISTS filter correlated on item_code"
+        },
+        {
+            "table": "Item Price",
+            "name": "idx_item_price_range",
+            "columns": ["price_list", "selling", "price_list_rate", "item_code"],
+            "comment": "price_list-led: covering range scan for price facets / BETWEEN filters across items"
+        },
+        {
+            "table": "Website Item",
+            "name": "idx_website_item_facets",
+            "columns": ["published", "item_group", "brand"],
+            "comment": "Covering index for item group / brand facet aggregation"
+        },
+        {
+            "table": "Website Item",
+            "name": "idx_website_item_brand",
+            "columns": ["published", "brand"],
+            "comment": "Covering index for brand facet aggregation"
         },
     ]
 
     ok = True
     for idx in indexes:
         try:
-            # Check if index already exists
-            existing = frappe.db.sql(f"""
-                SELECT 1 FROM information_schema.STATISTICS
-                WHERE table_schema = DATABASE()
-                AND table_name = 'tab{idx['table']}'
-                AND index_name = '{idx['name']}'
-            """)
-
-            if existing:
-                print(f"[INFO] Index '{idx['name']}' on {idx['table']} already exists")
-                continue
-
-            # Create the index
-            frappe.db.sql(f"""
-                ALTER TABLE `tab{idx['table']}`
-                ADD INDEX {idx['name']} ({idx['columns']})
-            """)
-            frappe.db.commit()
-            print(f"[SUCCESS] Created index '{idx['name']}' on {idx['table']} ({idx['columns']})")
-
+            # add_index checks for an existing index of the same name itself,
+            # so re-running on after_migrate is a no-op.
+            frappe.db.add_index(idx["table"], idx["columns"], idx["name"])
+            print(f"[SUCCESS] Ensured index '{idx['name']}' on {idx['table']} ({', '.join(idx['columns'])})")
         except Exception as e:
             print(f"[ERROR] Failed to create index '{idx['name']}': {e}")
             ok = False
@@ -400,6 +417,10 @@ def main():
         total_groups = 3
         success_groups = 0
 
+        # Item.badges and Website Item.filterable_badges are Table fields on
+        # Item Badge, so the child DocType has to exist before they are created.
+        sync_item_badge_doctype(frappe)
+
         if setup_item_fields(frappe):
             success_groups += 1
         if setup_website_item_fields(frappe):
@@ -407,7 +428,9 @@ def main():
         if setup_performance_indexes(frappe):
             success_groups += 1
 
-        sync_item_badge_doctype(frappe)
+        # Field and index helpers leave committing to the caller: once here for
+        # the standalone script, and at the end of `bench migrate` for after_migrate.
+        frappe.db.commit()
 
         print("=" * 60)
         if success_groups == total_groups:
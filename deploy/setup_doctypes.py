@@ -4,220 +4,207 @@
 Usage (from bench root):
 
     ./env/bin/python apps/catalog_extensions/deploy/setup_doctypes.py --site sitename
+
+The create_* helpers do not commit. main() commits once after every step
+has run and rolls back if one raises; when the helpers are called from the
+app's install/migrate hooks, bench commits at the end of that command.
+Note that DocType creation issues DDL, which MariaDB commits implicitly.
+
+Progress is reported through `logging`; main() configures a stdout handler
+(--quiet / --verbose adjust the level).
 """
 
+import functools
+import importlib.util
+import json
+import logging
 import os
 import sys
-import argparse
+
+log = logging.getLogger(__name__)
+
+
+def _app_version() -> str:
+    """Read __version__ from the app package without importing it (or frappe)."""
+
+    import re
+
+    init_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "catalog_extensions", "__init__.py"
+    )
+    try:
+        with open(init_path) as f:
+            match = re.search(r'^__version__\s*=\s*["\']([^"\']+)["\']', f.read(), re.M)
+    except OSError:
+        match = None
+    return match.group(1) if match else "unknown"
+
+
+_BENCH_ROOT = None
+
+
+def _bench_root() -> str:
+    global _BENCH_ROOT
+    if _BENCH_ROOT is None:
+        _BENCH_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return _BENCH_ROOT
 
 
 def get_frappe_connection(site: str):
     """Initialize Frappe connection for the given site."""
 
-    # Add bench root and apps to sys.path based on this file's location
-    bench_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    if bench_root not in sys.path:
-        sys.path.insert(0, bench_root)
-    apps_path = os.path.join(bench_root, "apps")
-    if apps_path not in sys.path:
-        sys.path.insert(0, apps_path)
+    # Only add bench root and apps to sys.path when frappe isn't already
+    # importable (it is under `bench execute` or the bench virtualenv).
+    if importlib.util.find_spec("frappe") is None:
+        bench_root = _bench_root()
+        log.debug(f"[INFO] frappe not importable, adding {bench_root} to sys.path")
+        if bench_root not in sys.path:
+            sys.path.insert(0, bench_root)
+        apps_path = os.path.join(bench_root, "apps")
+        if apps_path not in sys.path:
+            sys.path.insert(0, apps_path)
 
     try:
         import frappe
 
         frappe.init(site=site)
         frappe.connect()
+        # frappe opens the MariaDB socket lazily; open it now so a bad site
+        # config fails here rather than halfway through the setup steps.
+        frappe.db.sql("SELECT 1")
         return frappe
     except Exception as e:
-        print(f"[ERROR] Cannot connect to Frappe for site {site}: {e}")
+        log.error(f"[ERROR] Cannot connect to Frappe for site {site}: {e}")
         return None
 
 
-def create_catalog_price_range_doctype(frappe):
+SETUP_DOCTYPES = (
+    "Catalog Price Range",
+    "Webshop Simple Checkout Settings",
+    "Customer Group Brand Mapping",
+)
+
+
+# DocType payloads live in deploy/fixtures/*.doctype.json and are parsed once
+# per process. _copy_spec() hands frappe fresh row dicts on every insert,
+# because frappe fills in keys such as "doctype" on the rows it is given.
+_CATALOG_PRICE_RANGE_SPEC = "catalog_price_range.doctype.json"
+_WEBSHOP_SIMPLE_CHECKOUT_SPEC = "webshop_simple_checkout_settings.doctype.json"
+_CUSTOMER_GROUP_BRAND_MAPPING_SPEC = "customer_group_brand_mapping.doctype.json"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_spec(filename: str) -> dict:
+    """Parse a DocType spec from deploy/fixtures; callers must not mutate it."""
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", filename)) as f:
+        return json.load(f)
+
+
+def _copy_spec(spec: dict) -> dict:
+    """Return an insertable copy of a DocType spec with fresh child row dicts."""
+
+    return {key: [dict(row) for row in value] if isinstance(value, list) else value for key, value in spec.items()}
+
+
+def _new_doctype(frappe, spec: dict):
+    """Build an unsaved DocType document from a loaded spec."""
+
+    doc = frappe.new_doc("DocType")
+    doc.update(_copy_spec(spec))
+    return doc
+
+
+def _insert_doctype(frappe, spec: dict) -> None:
+    """Insert the DocType for `spec`; losing a race to a concurrent deploy is fine."""
+
+    try:
+        _new_doctype(frappe, spec).insert(ignore_permissions=True)
+    except frappe.DuplicateEntryError:
+        log.info(f"[INFO] DocType '{spec['name']}' was created concurrently")
+    _mark_doctype_created(frappe, spec["name"])
+
+
+def get_existing_doctypes(frappe, names=SETUP_DOCTYPES) -> set:
+    """Return which of `names` already exist, using a single query."""
+
+    existing = set(frappe.get_all("DocType", filters={"name": ["in", list(names)]}, pluck="name"))
+    _doctype_exists_cache(frappe).update((name, name in existing) for name in names)
+    return existing
+
+
+def _doctype_exists_cache(frappe) -> dict:
+    """Memo of DocType existence for the current frappe context.
+
+    It lives on frappe.local, so it only lasts until frappe.init/destroy sets
+    up a new request, job or site context; a later context queries again.
+    """
+
+    cache = getattr(frappe.local, "catalog_doctype_exists", None)
+    if cache is None:
+        cache = frappe.local.catalog_doctype_exists = {}
+    return cache
+
+
+def _doctype_exists(frappe, doctype_name, existing=None) -> bool:
+    if existing is not None:
+        return doctype_name in existing
+
+    cache = _doctype_exists_cache(frappe)
+    if doctype_name not in cache:
+        cache[doctype_name] = bool(frappe.db.exists("DocType", doctype_name))
+    return cache[doctype_name]
+
+
+def _mark_doctype_created(frappe, doctype_name) -> None:
+    _doctype_exists_cache(frappe)[doctype_name] = True
+
+
+def create_catalog_price_range_doctype(frappe, existing=None, dry_run=False):
     """Create the Catalog Price Range DocType if it doesn't exist."""
 
-    doctype_name = "Catalog Price Range"
-    module = "Catalog Extensions"
+    spec = _load_spec(_CATALOG_PRICE_RANGE_SPEC)
+    doctype_name = spec["name"]
 
-    if frappe.db.exists("DocType", doctype_name):
-        print(f"[INFO] DocType '{doctype_name}' already exists")
+    if _doctype_exists(frappe, doctype_name, existing):
+        log.info(f"[INFO] DocType '{doctype_name}' already exists")
         return True
 
-    print(f"[STEP] Creating DocType: {doctype_name}...")
+    log.info(f"[STEP] Creating DocType: {doctype_name}...")
+    if dry_run:
+        log.info(f"[DRY-RUN] Would create DocType '{doctype_name}'")
+        return True
 
     try:
-        doc = frappe.get_doc(
-            {
-                "doctype": "DocType",
-                "name": doctype_name,
-                "module": module,
-                "custom": 1,
-                "autoname": "field:label",
-                "fields": [
-                    {
-                        "fieldname": "label",
-                        "label": "Label",
-                        "fieldtype": "Data",
-                        "reqd": 1,
-                        "unique": 1,
-                        "in_list_view": 1,
-                    },
-                    {
-                        "fieldname": "from_amount",
-                        "label": "From Amount",
-                        "fieldtype": "Currency",
-                        "in_list_view": 1,
-                    },
-                    {
-                        "fieldname": "to_amount",
-                        "label": "To Amount",
-                        "fieldtype": "Currency",
-                        "in_list_view": 1,
-                    },
-                    {
-                        "fieldname": "sort_order",
-                        "label": "Sort Order",
-                        "fieldtype": "Int",
-                        "in_list_view": 1,
-                        "default": "0",
-                    },
-                    {
-                        "fieldname": "enabled",
-                        "label": "Enabled",
-                        "fieldtype": "Check",
-                        "default": "1",
-                        "in_list_view": 1,
-                    },
-                ],
-                "permissions": [
-                    {
-                        "role": "System Manager",
-                        "read": 1,
-                        "write": 1,
-                        "create": 1,
-                        "delete": 1,
-                    },
-                    {
-                        "role": "Website Manager",
-                        "read": 1,
-                        "write": 1,
-                        "create": 1,
-                        "delete": 1,
-                    },
-                ],
-                "track_changes": 1,
-                "engine": "InnoDB",
-                "sort_field": "sort_order",
-                "sort_order": "ASC",
-            }
-        )
-
-        doc.insert(ignore_permissions=True)
-        frappe.db.commit()
-
-        print(f"[SUCCESS] DocType '{doctype_name}' created successfully")
+        _insert_doctype(frappe, spec)
+
+        log.info(f"[SUCCESS] DocType '{doctype_name}' created successfully")
         return True
 
     except Exception as e:
-        print(f"[ERROR] Failed to create DocType: {e}")
+        log.error(f"[ERROR] Failed to create DocType: {e}")
         return False
 
 
-def create_webshop_simple_checkout_settings_doctype(frappe):
+def create_webshop_simple_checkout_settings_doctype(frappe, existing=None, dry_run=False):
 	"""Create the Webshop Simple Checkout Settings singleton DocType if missing.
 
 	This is used to control webshop checkout behaviour per site without
 	manual DocType creation in each environment.
 	"""
 
-	doctype_name = "Webshop Simple Checkout Settings"
-	module = "Catalog Extensions"
-	field_definitions = [
-		{
-			"fieldname": "enable_simple_checkout",
-			"label": "Legacy Webshop Checkout Toggle",
-			"fieldtype": "Check",
-			"default": "0",
-			"hidden": 1,
-			"read_only": 1,
-			"description": "Legacy compatibility field. Shipping and payment visibility is now controlled directly by the flags below.",
-		},
-		{
-			"fieldname": "hide_shipping_on_webshop",
-			"label": "Disable Shipping Section on Cart",
-			"fieldtype": "Check",
-			"default": "0",
-			"description": (
-				"Hide shipping and billing selectors on the cart, auto-apply the default address, "
-				"and suppress shipping tracking and return flow on order pages."
-			),
-		},
-		{
-			"fieldname": "hide_payment_on_webshop",
-			"label": "Disable Payment Section on Cart",
-			"fieldtype": "Check",
-			"default": "0",
-			"description": (
-				"Hide payment-related cart UI, skip the checkout payment workflow, apply default payment terms, "
-				"and suppress payment and refund actions on order pages. Prepaid and COD selection on the cart "
-				"become inactive while this is enabled."
-			),
-		},
-		{
-			"fieldname": "enable_prepaid",
-			"label": "Enable Prepaid",
-			"fieldtype": "Check",
-			"default": "1",
-			"description": "Allow customers to choose prepaid checkout when the payment section is enabled.",
-		},
-		{
-			"fieldname": "enable_cod",
-			"label": "Enable Cash on Delivery",
-			"fieldtype": "Check",
-			"default": "0",
-			"description": "Allow customers to choose cash on delivery when the payment section is enabled.",
-		},
-		{
-			"fieldname": "default_payment_mode",
-			"label": "Default Payment Mode",
-			"fieldtype": "Select",
-			"options": "PREPAID\nCOD",
-			"default": "PREPAID",
-			"description": "Use this payment mode by default when the payment section is enabled and multiple checkout payment modes are available.",
-		},
-		{
-			"fieldname": "default_shipping_address_type",
-			"label": "Default Shipping Address Type",
-			"fieldtype": "Select",
-			"options": "Shipping\nBilling",
-			"default": "Shipping",
-			"description": "Choose which saved address type should be auto-applied when shipping is hidden.",
-		},
-		{
-			"fieldname": "default_payment_term_template",
-			"label": "Default Payment Terms Template",
-			"fieldtype": "Link",
-			"options": "Payment Terms Template",
-			"description": "Automatically apply this payment terms template when payment is hidden.",
-		},
-		{
-			"fieldname": "enable_cancel_order",
-			"label": "Enable Cancel Order",
-			"fieldtype": "Check",
-			"default": "0",
-			"description": "Allow the cancel action on order pages when the order state normally permits cancellation.",
-		},
-	]
-
-	if frappe.db.exists("DocType", doctype_name):
-		print(f"[INFO] DocType '{doctype_name}' already exists")
+	spec = _load_spec(_WEBSHOP_SIMPLE_CHECKOUT_SPEC)
+	doctype_name = spec["name"]
+
+	if _doctype_exists(frappe, doctype_name, existing):
+		log.info(f"[INFO] DocType '{doctype_name}' already exists")
 		doctype = frappe.get_doc("DocType", doctype_name)
 		existing_fieldnames = {field.fieldname for field in doctype.fields or []}
 		fields_changed = False
 
 		for field in doctype.fields or []:
 			matching_definition = next(
-				(field_def for field_def in field_definitions if field_def["fieldname"] == field.fieldname),
+				(field_def for field_def in spec["fields"] if field_def["fieldname"] == field.fieldname),
 				None,
 			)
 			if not matching_definition:
@@ -227,165 +214,104 @@ def create_webshop_simple_checkout_settings_doctype(frappe):
 					setattr(field, key, matching_definition[key])
 					fields_changed = True
 
-		for field_def in field_definitions:
+		for field_def in spec["fields"]:
 			if field_def["fieldname"] in existing_fieldnames:
 				continue
-			doctype.append("fields", field_def)
+			doctype.append("fields", dict(field_def))
 			fields_changed = True
 
-		if fields_changed:
+		if fields_changed and dry_run:
+			log.info(f"[DRY-RUN] Would update fields on '{doctype_name}'")
+		elif fields_changed:
 			doctype.save(ignore_permissions=True)
-			frappe.db.commit()
-			print(f"[SUCCESS] Updated fields on '{doctype_name}'")
+			log.info(f"[SUCCESS] Updated fields on '{doctype_name}'")
 
 		return True
 
-	print(f"[STEP] Creating DocType: {doctype_name}...")
+	log.info(f"[STEP] Creating DocType: {doctype_name}...")
+	if dry_run:
+		log.info(f"[DRY-RUN] Would create DocType '{doctype_name}'")
+		return True
 
 	try:
-		doc = frappe.get_doc(
-			{
-				"doctype": "DocType",
-				"name": doctype_name,
-				"module": module,
-				"custom": 1,
-				"issingle": 1,
-				"fields": field_definitions,
-				"permissions": [
-					{
-						"role": "System Manager",
-						"read": 1,
-						"write": 1,
-						"create": 1,
-						"delete": 1,
-					},
-					{
-						"role": "Website Manager",
-						"read": 1,
-						"write": 1,
-					},
-				],
-				"track_changes": 1,
-				"engine": "InnoDB",
-			}
-		)
-
-		doc.insert(ignore_permissions=True)
-		frappe.db.commit()
-
-		print(f"[SUCCESS] DocType '{doctype_name}' created successfully")
+		_insert_doctype(frappe, spec)
+
+		log.info(f"[SUCCESS] DocType '{doctype_name}' created successfully")
 		return True
 
 	except Exception as e:
-		print(f"[ERROR] Failed to create DocType '{doctype_name}': {e}")
+		log.error(f"[ERROR] Failed to create DocType '{doctype_name}': {e}")
 		return False
 
 
-def create_customer_group_brand_mapping_doctype(frappe):
+def create_customer_group_brand_mapping_doctype(frappe, existing=None, dry_run=False):
     """Create the customer-group to brand mapping DocType if it doesn't exist."""
 
-    doctype_name = "Customer Group Brand Mapping"
-    module = "Catalog Extensions"
-    field_definitions = [
-        {
-            "fieldname": "customer_group",
-            "label": "Customer Group",
-            "fieldtype": "Link",
-            "options": "Customer Group",
-            "reqd": 1,
-            "in_list_view": 1,
-            "link_filters": '[["Customer Group", "is_group", "=", 0]]',
-        },
-        {
-            "fieldname": "brand",
-            "label": "Brand",
-            "fieldtype": "Link",
-            "options": "Brand",
-            "reqd": 1,
-            "in_list_view": 1,
-        },
-        {
-            "fieldname": "enabled",
-            "label": "Enabled",
-            "fieldtype": "Check",
-            "default": "1",
-            "in_list_view": 1,
-        },
-    ]
+    spec = _load_spec(_CUSTOMER_GROUP_BRAND_MAPPING_SPEC)
+    doctype_name = spec["name"]
 
-    if frappe.db.exists("DocType", doctype_name):
-        print(f"[INFO] DocType '{doctype_name}' already exists")
+    if _doctype_exists(frappe, doctype_name, existing):
+        log.info(f"[INFO] DocType '{doctype_name}' already exists")
         doctype = frappe.get_doc("DocType", doctype_name)
         existing_fieldnames = {field.fieldname for field in doctype.fields or []}
         fields_added = False
 
-        for field_def in field_definitions:
+        for field_def in spec["fields"]:
             if field_def["fieldname"] in existing_fieldnames:
                 continue
-            doctype.append("fields", field_def)
+            doctype.append("fields", dict(field_def))
             fields_added = True
 
-        if fields_added:
+        if fields_added and dry_run:
+            log.info(f"[DRY-RUN] Would add missing fields to '{doctype_name}'")
+        elif fields_added:
             doctype.save(ignore_permissions=True)
-            frappe.db.commit()
-            print(f"[SUCCESS] Added missing fields to '{doctype_name}'")
+            log.info(f"[SUCCESS] Added missing fields to '{doctype_name}'")
 
         return True
 
-    print(f"[STEP] Creating DocType: {doctype_name}...")
+    log.info(f"[STEP] Creating DocType: {doctype_name}...")
+    if dry_run:
+        log.info(f"[DRY-RUN] Would create DocType '{doctype_name}'")
+        return True
 
     try:
-        doc = frappe.get_doc(
-            {
-                "doctype": "DocType",
-                "name": doctype_name,
-                "module": module,
-                "custom": 1,
-                "autoname": "hash",
-                "title_field": "customer_group",
-                "fields": field_definitions,
-                "permissions": [
-                    {
-                        "role": "System Manager",
-                        "read": 1,
-                        "write": 1,
-                        "create": 1,
-                        "delete": 1,
-                    },
-                    {
-                        "role": "Website Manager",
-                        "read": 1,
-                        "write": 1,
-                        "create": 1,
-                        "delete": 1,
-                    },
-                ],
-                "track_changes": 1,
-                "sort_field": "modified",
-                "sort_order": "DESC",
-                "engine": "InnoDB",
-            }
-        )
-
-        doc.insert(ignore_permissions=True)
-        frappe.db.commit()
-
-        print(f"[SUCCESS] DocType '{doctype_name}' created successfully")
+        _insert_doctype(frappe, spec)
+
+        log.info(f"[SUCCESS] DocType '{doctype_name}' created successfully")
         return True
 
     except Exception as e:
-        print(f"[ERROR] Failed to create DocType '{doctype_name}': {e}")
+        log.error(f"[ERROR] Failed to create DocType '{doctype_name}': {e}")
         return False
 
 
-def create_default_price_ranges(frappe):
+_INSERT_EVENTS = ("before_insert", "after_insert")
+
+
+def _has_insert_hooks(frappe, doctype) -> bool:
+    """True if an installed app hooks inserts of `doctype` specifically.
+
+    Wildcard ("*") handlers are ignored: ERPNext registers generic ones on
+    every site, and they have nothing to do with seeding price ranges.
+    """
+
+    events = (frappe.get_hooks("doc_events") or {}).get(doctype) or {}
+    return any(events.get(event) for event in _INSERT_EVENTS)
+
+
+def create_default_price_ranges(frappe, dry_run=False):
     """Create default price range records if none exist."""
 
-    print("[STEP] Checking default price ranges...")
+    log.info("[STEP] Checking default price ranges...")
+
+    if dry_run and not _doctype_exists(frappe, "Catalog Price Range"):
+        log.info("[DRY-RUN] Would seed default price ranges")
+        return True
 
-    existing = frappe.db.count("Catalog Price Range")
-    if existing > 0:
-        print(f"[INFO] {existing} price range(s) already exist, skipping defaults")
+    if frappe.db.sql("SELECT 1 FROM `tabCatalog Price Range` LIMIT 1"):
+        existing = frappe.db.count("Catalog Price Range")
+        log.info(f"[INFO] {existing} price range(s) already exist, skipping defaults")
         return True
 
     default_ranges = [
@@ -396,39 +322,78 @@ def create_default_price_ranges(frappe):
         {"label": "Over $250", "from_amount": 250, "to_amount": None, "sort_order": 5},
     ]
 
+    if dry_run:
+        log.info(f"[DRY-RUN] Would create {len(default_ranges)} default price ranges")
+        return True
+
     try:
-        for range_data in default_ranges:
-            doc = frappe.get_doc(
-                {
-                    "doctype": "Catalog Price Range",
-                    **range_data,
-                    "enabled": 1,
-                }
+        if _has_insert_hooks(frappe, "Catalog Price Range"):
+            # Another app hooks inserts on this DocType, so go through the controller.
+            for r in default_ranges:
+                doc = frappe.new_doc("Catalog Price Range")
+                doc.update(r)
+                doc.enabled = 1
+                doc.insert(ignore_permissions=True)
+            log.info(f"[SUCCESS] Created {len(default_ranges)} default price ranges")
+            return True
+
+        # One multi-row INSERT; names follow the DocType's `field:label` autoname.
+        now = frappe.utils.now()
+        user = frappe.session.user
+        fields = [
+            "name", "label", "from_amount", "to_amount", "sort_order", "enabled",
+            "owner", "creation", "modified", "modified_by", "docstatus", "idx",
+        ]
+        values = [
+            (
+                r["label"], r["label"], r["from_amount"], r["to_amount"], r["sort_order"], 1,
+                user, now, now, user, 0, 0,
             )
-            doc.insert(ignore_permissions=True)
+            for r in default_ranges
+        ]
+        frappe.db.bulk_insert("Catalog Price Range", fields=fields, values=values)
+
+        # bulk_insert skips doc_events, so run what our on_update hooks would.
+        frappe.get_attr("catalog_extensions.api.clear_price_facets_template_cache")()
+        frappe.get_attr("catalog_extensions.api.clear_filter_facets_cache")()
 
-        frappe.db.commit()
-        print(f"[SUCCESS] Created {len(default_ranges)} default price ranges")
+        log.info(f"[SUCCESS] Created {len(default_ranges)} default price ranges")
         return True
 
     except Exception as e:
-        print(f"[ERROR] Failed to create price ranges: {e}")
+        log.error(f"[ERROR] Failed to create price ranges: {e}")
         return False
 
 
 def main():
+    # Imported here so importing this module as a library stays cheap.
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Automated DocType Setup for Catalog Extensions",
     )
     parser.add_argument("--site", required=True, help="Site name to setup")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {_app_version()}")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would change without writing anything"
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--quiet", action="store_true", help="Only report errors")
+    verbosity.add_argument("--verbose", action="store_true", help="Include debug output")
 
+    # --help/--version exit here, before frappe is imported or sys.path is touched.
     args = parser.parse_args()
 
-    print("=" * 60)
-    print("CATALOG EXTENSIONS - DOCTYPE SETUP")
-    print("=" * 60)
-    print(f"Site: {args.site}")
-    print("=" * 60)
+    level = logging.ERROR if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(level=level, format="%(message)s", stream=sys.stdout)
+
+    log.info("=" * 60)
+    log.info("CATALOG EXTENSIONS - DOCTYPE SETUP")
+    log.info("=" * 60)
+    log.info(f"Site: {args.site}")
+    if args.dry_run:
+        log.info("Mode: dry run (no changes will be written)")
+    log.info("=" * 60)
 
     frappe = get_frappe_connection(args.site)
     if not frappe:
@@ -436,20 +401,31 @@ def main():
 
     try:
         try:
-            if not create_catalog_price_range_doctype(frappe):
+            dry_run = args.dry_run
+            existing = get_existing_doctypes(frappe)
+            if not create_catalog_price_range_doctype(frappe, existing, dry_run=dry_run):
                 sys.exit(1)
-            create_default_price_ranges(frappe)
-            create_webshop_simple_checkout_settings_doctype(frappe)
-            create_customer_group_brand_mapping_doctype(frappe)
-
-            print("=" * 60)
-            print("[COMPLETE] DocType setup finished!")
-            print("=" * 60)
+            create_default_price_ranges(frappe, dry_run=dry_run)
+            create_webshop_simple_checkout_settings_doctype(frappe, existing, dry_run=dry_run)
+            create_customer_group_brand_mapping_doctype(frappe, existing, dry_run=dry_run)
+            # Dry runs write nothing. Otherwise skip the commit when every step hit
+            # its "already exists" branch; assume writes if frappe doesn't track them.
+            if dry_run:
+                frappe.db.rollback()
+            elif getattr(frappe.db, "transaction_writes", 1):
+                frappe.db.commit()
+
+            log.info("=" * 60)
+            log.info("[COMPLETE] DocType setup finished!")
+            log.info("=" * 60)
+        except Exception:
+            frappe.db.rollback()
+            raise
         finally:
             frappe.destroy()
 
     except Exception as e:
-        print(f"[ERROR] Failed to setup DocTypes: {e}")
+        log.error(f"[ERROR] Failed to setup DocTypes: {e}")
         sys.exit(1)
 
 